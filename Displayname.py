@@ -3,20 +3,23 @@ import numpy as np
 import random
 import string
 import time
-import pyttsx3
 import tkinter as tk
+from assets import assets
+import config
+from speech import SpeechWorker
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start()
 
 # Load Haar cascade classifiers
 face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
 smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.xml')
 
 # Load background images
-start_image = cv.imread('Background/Desktop Inital.png')
-smile_image = cv.imread('Background/Desktop input.png')
-final_bg = cv.imread('Background/Desktop final.png')
+start_image = assets.get('Background/Desktop Inital.png')
+smile_image = assets.get('Background/Desktop input.png')
+final_bg = assets.get('Background/Desktop final.png')
 
 # Configuration
 ROI_X, ROI_Y = 645, 130
@@ -164,8 +167,7 @@ while True:
             
             # Voice prompt every 5 seconds
             if time.time() - smile_start_time > 3:
-                engine.say("Please smile!")
-                engine.runAndWait()
+                speech.say(SMILE_PROMPT)
                 smile_start_time = time.time()
             
             if smile_detected:
@@ -173,7 +175,7 @@ while True:
                 open_name_dialog()
     
     elif current_state == FACE_RECOGNITION:
-        bg_image = cv.imread('Background/new.png')
+        bg_image = assets.get('Background/new.png').copy()
         ret, frame = cap.read()
         
         if ret:
@@ -207,5 +209,6 @@ while True:
 
 # Cleanup
 cap.release()
+speech.close()
 cv.destroyAllWindows()
 root.destroy()
\ No newline at end of file
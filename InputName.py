@@ -2,19 +2,22 @@ import cv2 as cv
 import numpy as np
 import random
 import time
-import pyttsx3
 import tkinter as tk
+from assets import assets
+import config
+from speech import SpeechWorker
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start()
 
 # Load Haar cascade classifiers
 face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
 smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.xml')
 
 # Load background images
-start_image = cv.imread('Background/Desktop Inital.png')
-smile_image = cv.imread('Background/Desktop input.png')
+start_image = assets.get('Background/Desktop Inital.png')
+smile_image = assets.get('Background/Desktop input.png')
 
 if start_image is None or smile_image is None:
     print("Error: Could not load background images")
@@ -145,8 +148,7 @@ while True:
             detect_face_and_smile(frame)
             
             if time.time() - smile_start_time > 5:
-                engine.say("Please smile!")
-                engine.runAndWait()
+                speech.say(SMILE_PROMPT)
                 smile_start_time = time.time()
                 
             if smile_detected:
@@ -154,7 +156,7 @@ while True:
                 open_name_dialog()
                 
     elif current_state == FACE_RECOGNITION:
-        bg_image = cv.imread('Background/new.png')
+        bg_image = assets.get('Background/new.png').copy()
         ret, frame = cap.read()
         
         if ret:
@@ -191,5 +193,6 @@ while True:
 
 # Cleanup
 cap.release()
+speech.close()
 cv.destroyAllWindows()
 root.destroy()
\ No newline at end of file
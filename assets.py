@@ -0,0 +1,75 @@
+import cv2 as cv
+import os
+import glob
+import threading
+import logging
+
+# Decoded image cache for the kiosk backgrounds and figma assets.
+#
+# Each file is decoded once, on first use or by preload(), and every resized
+# variant is kept alongside it, keyed by target (width, height). Cached arrays
+# are read-only: per-frame compositing must start from a copy (or a canvas of
+# its own), never draw into the shared buffer.
+
+ASSET_DIRS = ['Background', 'figma']
+IMAGE_PATTERNS = ['*.png', '*.jpg', '*.jpeg']
+
+
+class AssetCache:
+    def __init__(self):
+        self._images = {}   # (path, size or None) -> ndarray
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, size=None):
+        """Returns the decoded image, resized to size=(width, height) if given, or None if unreadable."""
+        key = (os.path.normpath(path), tuple(size) if size else None)
+        with self._lock:
+            image = self._images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        if size:
+            original = self.get(path)
+            if original is None:
+                return None
+            image = original if original.shape[1::-1] == tuple(size) else cv.resize(original, tuple(size))
+        else:
+            image = cv.imread(path)
+            if image is None:
+                logging.error(f"Failed to load asset: {path}")
+                return None
+        image.flags.writeable = False
+        with self._lock:
+            self._images[key] = image
+        return image
+
+    def preload(self, paths, size=None):
+        for path in paths:
+            self.get(path, size)
+        logging.info(f"Preloaded {len(paths)} assets ({self.memory_bytes() / 1e6:.1f} MB cached)")
+
+    def preload_dirs(self, dirs=ASSET_DIRS, size=None):
+        paths = [p for d in dirs for pattern in IMAGE_PATTERNS for p in sorted(glob.glob(os.path.join(d, pattern)))]
+        self.preload(paths, size)
+
+    def memory_bytes(self):
+        with self._lock:
+            # A same-size "resize" shares the original's buffer; count it once
+            return sum(image.nbytes for image in {id(i): i for i in self._images.values()}.values())
+
+    def report(self):
+        with self._lock:
+            entries = sorted(self._images.items(), key=lambda item: item[0][0])
+        lines = [f"{len(entries)} cached images, {self.memory_bytes() / 1e6:.1f} MB, "
+                 f"{self.hits} hits / {self.misses} misses"]
+        for (path, size), image in entries:
+            label = f"{size[0]}x{size[1]}" if size else "original"
+            lines.append(f"  {path} [{label}] {image.nbytes / 1e6:.1f} MB")
+        return "\n".join(lines)
+
+
+# Shared instance used by the kiosk scripts
+assets = AssetCache()
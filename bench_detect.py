@@ -0,0 +1,257 @@
+import cv2 as cv
+import numpy as np
+import os
+import ast
+import glob
+import time
+import random
+import logging
+import argparse
+import tracemalloc
+
+from frame_source import load_session, INDEX_FILE
+from detection import detect_faces
+from pacing import DetectionCadence
+from detectors import BACKENDS, create_backend, make_profile
+import config
+
+# Benchmark harness for the detect_face_and_smile variants.
+#
+#   python bench_detect.py <corpus> [--variants final voice ...] [--repeat N]
+#
+# <corpus> is a session recorded with frame_source.py or a plain directory of
+# images. Every variant sees the same frames in the same order and is scored
+# against the reference variant for smile-hit agreement.
+
+SCRIPT_VARIANTS = ['final.py', 'voice.py', 'detect_one.py', 'randomshape.py', 'InputName.py']
+# InputName.py is the untouched full-resolution first-face detector
+REFERENCE_VARIANT = 'InputName'
+PYRAMID_SCALES = [1.0, 0.5, 0.33]
+
+# name -> callable(frame) -> bool (smile detected)
+VARIANTS = {}
+
+
+def register_variant(name):
+    """Decorator for adding a detector to the benchmark: @register_variant('name')."""
+    def wrap(func):
+        VARIANTS[name] = func
+        return func
+    return wrap
+
+
+def load_script_variant(path, backend):
+    """Pulls detect_face_and_smile out of a kiosk script without running the script.
+
+    The scripts open the camera and windows at import time, so only the
+    function definitions are compiled, into a namespace that provides the
+    module globals they expect.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    # Every top-level def is compiled so helpers the detector calls are available
+    funcs = [node for node in tree.body if isinstance(node, ast.FunctionDef)]
+    func = next((node for node in funcs if node.name == 'detect_face_and_smile'), None)
+    if func is None:
+        raise ValueError(f"{path} has no detect_face_and_smile")
+    namespace = {
+        'cv': cv, 'np': np, 'random': random, 'logging': logging,
+        'face_cascade': backend.face_cascade, 'smile_cascade': backend.smile_cascade,
+        'smile_detected': False, 'captured_frame': None,
+        'detector': backend,
+        'face_tracker': backend.make_tracker(config.DETECT_SCALE, config.TRACK_PADDING,
+                                             config.TRACK_RESCAN_EVERY),
+        'detection_service': None,
+        # Corpus frames are independent stills, so gating would only skip work
+        'presence_gate': None,
+        # Benchmark every frame; never reuse a previous frame's result
+        'cadence': DetectionCadence(max_interval=1),
+        'last_detection': (None, False),
+    }
+    # Replay the script's own imports so helpers like detection.detect_faces
+    # resolve; imports the benchmark does not need (TTS, Sheets) may be missing
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            try:
+                exec(compile(ast.Module(body=[node], type_ignores=[]), path, 'exec'), namespace)
+            except ImportError:
+                pass
+    exec(compile(ast.Module(body=funcs, type_ignores=[]), path, 'exec'), namespace)
+    detect = namespace['detect_face_and_smile']
+    # Older copies return the result, newer ones publish it in a global
+    uses_global = any(isinstance(node, ast.Global) and 'smile_detected' in node.names
+                      for node in ast.walk(func))
+
+    def run(frame):
+        result = detect(frame)
+        return bool(namespace['smile_detected']) if uses_global else bool(result)
+    return run
+
+
+def load_corpus(path, limit=None):
+    if os.path.exists(os.path.join(path, INDEX_FILE)):
+        files = [p for _, p in load_session(path)]
+    else:
+        files = sorted(glob.glob(os.path.join(path, '*.png')) + glob.glob(os.path.join(path, '*.jpg')))
+    if limit:
+        files = files[:limit]
+    frames = [cv.imread(p) for p in files]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        raise ValueError(f"No frames found in {path}")
+    return frames
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def bench_variant(detect, frames, repeat=1, seed=0):
+    """Runs one variant over the corpus and returns its timing, allocation and hit stats."""
+    random.seed(seed)
+    latencies = []
+    hits = []
+    for _ in range(repeat):
+        hits = []
+        for frame in frames:
+            # Some variants draw on the frame in place; keep the corpus pristine
+            work = frame.copy()
+            t0 = time.perf_counter()
+            hit = detect(work)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            hits.append(hit)
+
+    # Allocations are measured in a separate pass so tracing does not skew latency
+    random.seed(seed)
+    tracemalloc.start()
+    alloc_total = 0
+    alloc_peak = 0
+    for frame in frames:
+        work = frame.copy()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        detect(work)
+        current, peak = tracemalloc.get_traced_memory()
+        alloc_total += max(current - before, 0)
+        alloc_peak = max(alloc_peak, peak - before)
+    tracemalloc.stop()
+
+    total_s = sum(latencies) / 1000.0
+    return {
+        'frames': len(latencies),
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'fps': len(latencies) / total_s if total_s > 0 else float('inf'),
+        'alloc_peak_kb': alloc_peak / 1024.0,
+        'alloc_retained_kb': alloc_total / 1024.0,
+        'hits': hits,
+    }
+
+
+def agreement(hits, reference):
+    if not reference:
+        return 0.0
+    return sum(a == b for a, b in zip(hits, reference)) / len(reference)
+
+
+def print_report(results, reference_name):
+    reference = results[reference_name]['hits'] if reference_name in results else None
+    header = f"{'variant':<16}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'fps':>9}{'peak KB':>10}{'smiles':>8}{'agree':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        agree = f"{agreement(r['hits'], reference) * 100:.1f}%" if reference is not None else 'n/a'
+        print(f"{name:<16}{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}"
+              f"{r['fps']:>9.1f}{r['alloc_peak_kb']:>10.1f}{sum(r['hits']):>8}{agree:>8}")
+
+
+def register_script_variants(backend):
+    here = os.path.dirname(os.path.abspath(__file__))
+    for script in SCRIPT_VARIANTS:
+        name = os.path.splitext(script)[0]
+        if name not in VARIANTS:
+            VARIANTS[name] = load_script_variant(os.path.join(here, script), backend)
+
+
+def _first_face_smile(backend, scale):
+    bounds = {}
+    if backend.profile is not None:
+        bounds = {'min_size': backend.profile.face_min_size, 'max_size': backend.profile.face_max_size}
+
+    def run(frame):
+        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        faces = detect_faces(backend.face_cascade, gray, scale,
+                             backend.face_scale_factor, backend.face_min_neighbors, **bounds)
+        if len(faces) == 0:
+            return False
+        x, y, w, h = faces[0]
+        return backend.detect_smile(gray[y:y+h, x:x+w])
+    return run
+
+
+def register_pyramid_variants(backend):
+    for scale in PYRAMID_SCALES:
+        VARIANTS.setdefault(f"pyramid@{scale:g}", _first_face_smile(backend, scale))
+
+
+def register_profile_variant():
+    # Same as pyramid@DETECT_SCALE plus the geometry-derived size bounds and
+    # mouth-only smile search; the profile follows the corpus frame size
+    profiled = {}
+
+    def run(frame):
+        height, width = frame.shape[:2]
+        if (width, height) not in profiled:
+            profiled[(width, height)] = _first_face_smile(create_backend('haar', make_profile(width, height)),
+                                                          config.DETECT_SCALE)
+        return profiled[(width, height)](frame)
+    VARIANTS.setdefault(f"profile@{config.DETECT_SCALE:g}", run)
+
+
+def register_backend_variants():
+    # Side-by-side comparison of every detector backend that loads on this machine
+    for name, factory in BACKENDS.items():
+        try:
+            backend = factory()
+        except Exception as e:
+            logging.warning(f"Skipping backend '{name}': {e}")
+            continue
+        VARIANTS.setdefault(f"backend:{name}", _first_face_smile(backend, config.DETECT_SCALE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detect_face_and_smile variants")
+    parser.add_argument('corpus', help="recorded session or directory of images")
+    parser.add_argument('--variants', nargs='*', help="variants to run (default: all)")
+    parser.add_argument('--reference', default=REFERENCE_VARIANT, help="variant to score agreement against")
+    parser.add_argument('--repeat', type=int, default=3, help="timed passes over the corpus")
+    parser.add_argument('--limit', type=int, help="use only the first N frames")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    backend = create_backend('haar')
+    register_script_variants(backend)
+    register_pyramid_variants(backend)
+    register_profile_variant()
+    register_backend_variants()
+
+    frames = load_corpus(args.corpus, args.limit)
+    logging.info(f"Loaded {len(frames)} frames from {args.corpus}")
+
+    names = args.variants or list(VARIANTS)
+    results = {}
+    for name in names:
+        if name not in VARIANTS:
+            logging.error(f"Unknown variant: {name}")
+            continue
+        # Warm up so cascade and allocator first-touch costs are not counted
+        VARIANTS[name](frames[0].copy())
+        results[name] = bench_variant(VARIANTS[name], frames, repeat=args.repeat)
+        logging.info(f"Benchmarked {name}")
+    print_report(results, args.reference)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import time
+import logging
+import argparse
+import tempfile
+import numpy as np
+
+from registration_db import RegistrationDB, RegistrySync
+from registry import FakeSheetsRegistry, FileRegistry
+from name_index import NameIndex
+from token_allocator import TokenAllocator
+
+# Load test for the registration path against a simulated network.
+#
+#   python bench_registry.py [--count N] [--latency S] [--error-rate F] [--quota Q]
+#
+# Runs the save_name() path (duplicate check, token allocation, local commit)
+# N times against a fake Sheets server with the given latency, error rate
+# and per-minute quota. It reports how long the desk was blocked per
+# registration and how long the background sync needed to catch up. --inline
+# runs the old path for comparison: fetch the name column and append one
+# row per registration, synchronously.
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def run_write_behind(registry, workdir, count, interval):
+    db = RegistrationDB(os.path.join(workdir, 'registrations.db'))
+    tokens = TokenAllocator(os.path.join(workdir, 'tokens.log'))
+    sync = RegistrySync(db, registry.append, target=registry.name, interval=0.2, min_backoff=0.5).start()
+    index = NameIndex(registry.names, reconcile_interval=3600).start()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        name = f"Participant {i}"
+        if not (db.has_name(name) or index.contains(name)):
+            db.add(name, tokens.allocate())
+            sync.notify()
+        latencies.append(time.perf_counter() - t)
+        if interval:
+            time.sleep(interval)
+    registered = time.perf_counter() - started
+    while sync.depth:
+        time.sleep(0.05)
+    drained = time.perf_counter() - started
+    stats = sync.stats()
+    sync.close()
+    index.close()
+    tokens.close()
+    db.close()
+    return latencies, registered, drained, stats
+
+
+def run_inline(registry, count, interval):
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    for i in range(count):
+        t = time.perf_counter()
+        name = f"Participant {i}"
+        try:
+            if name not in registry.names():
+                registry.append([[name, f"{i:03d}"]])
+        except Exception:
+            failures += 1   # the old code logged and dropped the row
+        latencies.append(time.perf_counter() - t)
+        if interval:
+            time.sleep(interval)
+    registered = time.perf_counter() - started
+    return latencies, registered, registered, {'failures': failures, 'lost': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the registration path against a fake Sheets server")
+    parser.add_argument('--count', type=int, default=200, help="registrations to run")
+    parser.add_argument('--interval', type=float, default=0.0, help="seconds between registrations")
+    parser.add_argument('--latency', type=float, default=0.5, help="fake Sheets latency per request")
+    parser.add_argument('--error-rate', type=float, default=0.1, help="fraction of requests failed with 503")
+    parser.add_argument('--quota', type=int, default=60, help="requests per minute (0: unlimited)")
+    parser.add_argument('--inline', action='store_true', help="run the old synchronous path instead")
+    parser.add_argument('--file', action='store_true', help="use the CSV file backend instead of fake Sheets")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.file:
+            registry = FileRegistry(os.path.join(workdir, 'registry.csv'))
+        else:
+            registry = FakeSheetsRegistry(args.latency, args.error_rate, args.quota)
+        if args.inline:
+            latencies, registered, drained, stats = run_inline(registry, args.count, args.interval)
+        else:
+            latencies, registered, drained, stats = run_write_behind(registry, workdir, args.count, args.interval)
+        # Counted from the fake server's own state: another request could hit
+        # the simulated errors or quota and end the run without a report
+        rows = len(registry.names()) if args.file else len(registry.sheets.rows())
+        registry.close()
+
+    mode = 'inline' if args.inline else 'write-behind'
+    print(f"{mode}: {args.count} registrations, backend {registry.name}")
+    print(f"  blocked per registration: p50 {percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p90 {percentile(latencies, 90) * 1000:.2f} ms, p99 {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  desk throughput: {args.count / registered:.1f} registrations/s")
+    print(f"  registry caught up after {drained:.1f} s with {rows} rows; {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import cv2 as cv
+import time
+import threading
+import logging
+
+# Three slots is the minimum for latest-frame-wins: one being written by the
+# capture thread, one holding the newest complete frame, one held by the caller.
+RING_SIZE = 3
+
+# Pause before retrying a failed read on a device that is still open, so a
+# transient camera dropout does not spin the capture thread.
+READ_RETRY_DELAY = 0.005
+
+
+class ThreadedCapture:
+    """Reads frames from a cv.VideoCapture on a background thread.
+
+    Frames are decoded into a small ring of preallocated buffers. read() never
+    waits on the camera: it returns the most recent complete frame, and any
+    frames the main loop was too slow to consume are simply overwritten.
+    The array returned by read() stays valid until the next call to read().
+    """
+
+    def __init__(self, index=0, width=None, height=None, ring_size=RING_SIZE):
+        if ring_size < 3:
+            raise ValueError("ring_size must be at least 3")
+        self.cap = cv.VideoCapture(index)
+        if width is not None:
+            self.cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+
+        self._buffers = [None] * ring_size
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._latest = -1      # slot holding the newest complete frame
+        self._reading = -1     # slot currently handed out to the caller
+        self._seq = 0          # frames captured so far
+        self._seq_read = 0     # seq of the frame last handed out
+        self._running = False
+        self._thread = None
+        self.dropped = 0       # frames overwritten before the caller saw them
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self, first_frame_timeout=2.0):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ThreadedCapture", daemon=True)
+        self._thread.start()
+        # Block once at startup so the first read() has something to return
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._seq > 0 or not self._running, first_frame_timeout)
+        logging.info("Threaded capture started")
+        return self
+
+    def _next_write_slot(self):
+        for i in range(len(self._buffers)):
+            if i != self._latest and i != self._reading:
+                return i
+
+    def _run(self):
+        while self._running:
+            with self._lock:
+                slot = self._next_write_slot()
+            buf = self._buffers[slot]
+            # cap.read() decodes straight into buf when the size matches
+            ret, frame = self.cap.read(buf) if buf is not None else self.cap.read()
+            if not ret:
+                if not self.cap.isOpened():
+                    logging.error("Camera closed - stopping capture thread")
+                    self._running = False
+                    with self._new_frame:
+                        self._new_frame.notify_all()
+                else:
+                    time.sleep(READ_RETRY_DELAY)
+                continue
+            with self._new_frame:
+                self._buffers[slot] = frame
+                if self._seq > self._seq_read and self._latest != -1:
+                    self.dropped += 1
+                self._latest = slot
+                self._seq += 1
+                self._new_frame.notify_all()
+
+    def read(self):
+        """Returns (ret, frame) like cv.VideoCapture.read(), without blocking."""
+        with self._lock:
+            if self._latest == -1:
+                return False, None
+            self._reading = self._latest
+            self._seq_read = self._seq
+            return True, self._buffers[self._reading]
+
+    @property
+    def frame_count(self):
+        return self._seq
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.cap.release()
+        logging.info(f"Threaded capture stopped ({self._seq} frames, {self.dropped} dropped)")
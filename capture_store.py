@@ -0,0 +1,157 @@
+import cv2 as cv
+import os
+import json
+import time
+import queue
+import threading
+import logging
+
+# Store for registrant photos.
+#
+# save() only queues the image, so the Tk callback that registers a
+# participant never waits on an encode or a disk write. A background thread
+# encodes it in the configured format (PNG by default, or JPEG/WebP with
+# quality), writes it, and appends a line to index.jsonl mapping token ->
+# path, size and time. path() answers from the in-memory index, so lookups
+# never scan directories.
+#
+# By default photos stay at <root>/<token>.<ext>, where anything outside the
+# kiosk expects them. With shard_digits > 0 they go into a subdirectory
+# named after the token's last digits instead, for events large enough that
+# one flat directory gets slow. The first start without an index.jsonl
+# indexes the photos already in the root, so older captures and a later
+# switch to shards lose nothing; after that startup reads only the index.
+
+FORMATS = {
+    'png': ('.png', lambda quality: [cv.IMWRITE_PNG_COMPRESSION, 3]),
+    'jpg': ('.jpg', lambda quality: [cv.IMWRITE_JPEG_QUALITY, quality]),
+    'webp': ('.webp', lambda quality: [cv.IMWRITE_WEBP_QUALITY, quality]),
+}
+
+
+class CaptureStore:
+    def __init__(self, root='captures', fmt='png', quality=90, shard_digits=0):
+        fmt = fmt.lower().lstrip('.').replace('jpeg', 'jpg')
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown capture format '{fmt}', expected one of {sorted(FORMATS)}")
+        self.root = root
+        self.fmt = fmt
+        self.quality = quality
+        self.shard_digits = shard_digits
+        self.index_path = os.path.join(root, 'index.jsonl')
+        self._entries = {}   # token -> {'path', 'bytes', 'time'}
+        self._shards = set()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._index = None
+        self._thread = None
+        self.saved = 0
+        self.bytes_written = 0
+        self.encode_time = 0.0
+        self._load()
+
+    def _load(self):
+        os.makedirs(self.root, exist_ok=True)
+        if not os.path.exists(self.index_path):
+            self._index_existing()
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._entries[entry.pop('token')] = entry
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    logging.warning(f"Skipping malformed line in {self.index_path}: {line.strip()!r}")
+        logging.info(f"Capture store: {len(self._entries)} photos indexed in {self.root}")
+
+    def _index_existing(self):
+        """Writes an index for photos saved before there was one."""
+        with open(self.index_path, 'a', encoding='utf-8') as index:
+            for name in sorted(os.listdir(self.root)):
+                token, ext = os.path.splitext(name)
+                if ext.lower() in ('.png', '.jpg', '.jpeg', '.webp'):
+                    path = os.path.join(self.root, name)
+                    entry = {'path': path, 'bytes': os.path.getsize(path), 'time': os.path.getmtime(path)}
+                    index.write(json.dumps({'token': token, **entry}) + '\n')
+                    self._entries[token] = entry
+        logging.info(f"Capture store: indexed {len(self._entries)} existing photos in {self.root}")
+
+    def start(self):
+        self._index = open(self.index_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="CaptureStore", daemon=True)
+        self._thread.start()
+        return self
+
+    def _shard_path(self, token):
+        if not self.shard_digits:
+            return os.path.join(self.root, token + FORMATS[self.fmt][0])
+        shard = token[-self.shard_digits:].rjust(self.shard_digits, '0')
+        directory = os.path.join(self.root, shard)
+        if shard not in self._shards:
+            os.makedirs(directory, exist_ok=True)
+            self._shards.add(shard)
+        return os.path.join(directory, token + FORMATS[self.fmt][0])
+
+    def save(self, token, image):
+        """Queues image to be stored under token; returns immediately."""
+        self._queue.put((token, image.copy(), time.time()))
+
+    def _run(self):
+        ext, params = FORMATS[self.fmt]
+        while True:
+            item = self._queue.get()
+            if item is None:
+                # The index is only closed here, so a slow last encode still gets recorded
+                self._index.close()
+                break
+            token, image, taken = item
+            try:
+                started = time.perf_counter()
+                ok, encoded = cv.imencode(ext, image, params(self.quality))
+                if not ok:
+                    raise RuntimeError(f"{self.fmt} encoding failed")
+                path = self._shard_path(token)
+                with open(path, 'wb') as f:
+                    f.write(encoded.tobytes())
+                entry = {'path': path, 'bytes': len(encoded), 'time': taken}
+                self._index.write(json.dumps({'token': token, **entry}) + '\n')
+                self._index.flush()
+                with self._lock:
+                    self._entries[token] = entry
+                self.saved += 1
+                self.bytes_written += len(encoded)
+                self.encode_time += time.perf_counter() - started
+                logging.info(f"Saved image: {path} ({len(encoded) / 1024:.0f} KB)")
+            except Exception as e:
+                logging.error(f"Failed to save capture for token {token}: {e}")
+
+    def path(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+        return entry['path'] if entry else None
+
+    def tokens(self):
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            'photos': len(self._entries),
+            'saved': self.saved,
+            'pending': self.pending,
+            'avg_kb': self.bytes_written / self.saved / 1024 if self.saved else 0.0,
+            'avg_encode_ms': self.encode_time / self.saved * 1000 if self.saved else 0.0,
+        }
+
+    def close(self, timeout=5.0):
+        """Finishes queued writes (waiting up to timeout); the writer thread closes the index."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logging.warning(f"Capture store still writing {self.pending} photos after {timeout}s")
@@ -0,0 +1,53 @@
+import cv2 as cv
+import numpy as np
+
+# Persistent-canvas compositing for the kiosk screens.
+#
+# Instead of copying a 1920x1080 background and pasting into it every frame,
+# each screen keeps one canvas. Per frame only the regions that change are
+# rewritten: the webcam ROI is resized straight into the canvas, and a text
+# label is redrawn only when its text changes, after restoring the
+# background under the old one.
+
+
+class Compositor:
+    def __init__(self, background):
+        self.background = background
+        self.canvas = background.copy()
+        self._labels = {}   # key -> (text, rect) currently drawn
+
+    def reset(self):
+        np.copyto(self.canvas, self.background)
+        self._labels.clear()
+
+    def paste(self, frame, x, y, width, height):
+        """Resizes frame directly into the canvas region at x, y."""
+        region = self.canvas[y:y+height, x:x+width]
+        if frame.shape[1] == width and frame.shape[0] == height:
+            np.copyto(region, frame)
+            return
+        resized = cv.resize(frame, (width, height), dst=region)
+        if resized is not region:
+            np.copyto(region, resized)
+
+    def _restore(self, rect):
+        x1, y1, x2, y2 = rect
+        self.canvas[y1:y2, x1:x2] = self.background[y1:y2, x1:x2]
+
+    def label(self, key, text, org, font=cv.FONT_HERSHEY_SIMPLEX, font_scale=1.0,
+              color=(255, 255, 255), thickness=2):
+        """Draws text at org (baseline-left, as cv.putText); an empty text clears the label."""
+        current = self._labels.get(key)
+        if current is not None and current[0] == (text, org):
+            return
+        if current is not None:
+            self._restore(current[1])
+            del self._labels[key]
+        if not text:
+            return
+        (tw, th), baseline = cv.getTextSize(text, font, font_scale, thickness)
+        height, width = self.canvas.shape[:2]
+        rect = (max(org[0] - thickness, 0), max(org[1] - th - thickness, 0),
+                min(org[0] + tw + thickness, width), min(org[1] + baseline + thickness, height))
+        cv.putText(self.canvas, text, org, font, font_scale, color, thickness)
+        self._labels[key] = ((text, org), rect)
@@ -0,0 +1,98 @@
+import os
+
+# Kiosk settings that can be changed per desk without editing the scripts.
+# Each value can be overridden with the matching REGDESK_* environment variable.
+
+def _env(name, default):
+    return os.environ.get('REGDESK_' + name, default)
+
+def _env_bool(name, default):
+    value = _env(name, None)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Frame source
+CAMERA_INDEX = int(_env('CAMERA_INDEX', 0))
+REPLAY_DIR = _env('REPLAY_DIR', '')          # replay a recorded session instead of the webcam
+REPLAY_REALTIME = _env_bool('REPLAY_REALTIME', True)   # False = feed frames as fast as they are read
+REPLAY_LOOP = _env_bool('REPLAY_LOOP', True)
+RECORD_DIR = _env('RECORD_DIR', '')          # record every frame the main loop reads
+
+# Face detection
+# The face cascade runs on a copy of the frame downscaled by this factor and the
+# boxes are mapped back to full resolution. Cost drops by roughly scale**2.
+DETECT_SCALE = float(_env('DETECT_SCALE', 0.5))
+
+# Face tracking: after a hit, search only the last face box grown by
+# TRACK_PADDING (fraction of the box size) on each side, with a full-frame
+# rescan on a miss or every TRACK_RESCAN_EVERY frames.
+TRACK_PADDING = float(_env('TRACK_PADDING', 0.5))
+TRACK_RESCAN_EVERY = int(_env('TRACK_RESCAN_EVERY', 15))
+
+# Detection worker processes. 0 runs detection inline in the UI loop.
+DETECTION_WORKERS = int(_env('DETECTION_WORKERS', 0))
+DETECTION_MAX_IN_FLIGHT = int(_env('DETECTION_MAX_IN_FLIGHT', 0)) or None   # default: 2 per worker
+
+# Presence gate: skip the cascades while a downsampled view of the scene is
+# unchanged and no face was seen recently. MOTION_MAX_SKIP bounds how many
+# frames in a row can be skipped.
+MOTION_GATE = _env_bool('MOTION_GATE', True)
+MOTION_CHANGED_FRACTION = float(_env('MOTION_CHANGED_FRACTION', 0.02))
+MOTION_MAX_SKIP = int(_env('MOTION_MAX_SKIP', 30))
+
+# Detector backend: 'haar', 'local' or 'lbp' (see detectors.py); startup fails if it cannot load
+DETECTOR_BACKEND = _env('DETECTOR_BACKEND', 'haar')
+MODEL_DIR = _env('MODEL_DIR', 'Recognition_models')
+FACE_MODEL = _env('FACE_MODEL', '')          # explicit face cascade path for the 'local' backend
+
+# Detection profile: face size bounds and smile search area derived from the
+# camera field of view and how far registrants stand from the desk.
+DETECTION_PROFILE = _env_bool('DETECTION_PROFILE', True)
+CAMERA_HFOV_DEG = float(_env('CAMERA_HFOV_DEG', 60))
+STAND_DISTANCE_MIN = float(_env('STAND_DISTANCE_MIN', 0.4))   # metres
+STAND_DISTANCE_MAX = float(_env('STAND_DISTANCE_MAX', 1.5))
+MOUTH_TOP = float(_env('MOUTH_TOP', 0.55))   # smile search starts this far down the face box
+
+# Adaptive detection cadence: when detection plus rendering no longer fits
+# the TARGET_FPS frame budget, detect only every k-th frame (k <= DETECT_MAX_INTERVAL)
+TARGET_FPS = float(_env('TARGET_FPS', 20))
+DETECT_MAX_INTERVAL = int(_env('DETECT_MAX_INTERVAL', 6))
+
+# Main loop pacing: frame rate for screens that only wait for input
+# (START, FINAL_DISPLAY). Camera screens run at TARGET_FPS.
+STATIC_FPS = float(_env('STATIC_FPS', 10))
+
+# Fixed voice prompts are rendered to WAV here once and replayed from disk
+PROMPT_CACHE_DIR = _env('PROMPT_CACHE_DIR', 'prompt_cache')
+
+# Registrations: local SQLite database (the system of record), and the older
+# JSON-lines journal imported into it on first start
+REGISTRATION_DB = _env('REGISTRATION_DB', 'registrations.db')
+REGISTRATION_JOURNAL = _env('REGISTRATION_JOURNAL', 'registrations.jsonl')
+
+# Registry backend the database syncs to: 'sheets', 'file' or 'fake' (see registry.py)
+REGISTRY_BACKEND = _env('REGISTRY_BACKEND', 'sheets')
+SPREADSHEET_ID = _env('SPREADSHEET_ID', '1y56bOATGzEmlZVMfir7WB2QHs32iyKh7fK5g4FuewJI')
+CREDENTIALS_FILE = _env('CREDENTIALS_FILE', 'asthra-participant-list-55acad99e49d.json')
+SHEETS_APPEND_RANGE = _env('SHEETS_APPEND_RANGE', 'Sheet1!A:B')   # columns A (Name) and B (Token)
+SHEETS_NAMES_RANGE = _env('SHEETS_NAMES_RANGE', 'Sheet1!A:A')
+SHEETS_ENDPOINT = _env('SHEETS_ENDPOINT', '')   # API endpoint override, e.g. a fake_sheets.py server
+REGISTRY_FILE = _env('REGISTRY_FILE', 'registry.csv')
+FAKE_SHEETS_LATENCY = float(_env('FAKE_SHEETS_LATENCY', 0.5))      # seconds per request
+FAKE_SHEETS_ERROR_RATE = float(_env('FAKE_SHEETS_ERROR_RATE', 0.1))
+FAKE_SHEETS_QUOTA = int(_env('FAKE_SHEETS_QUOTA', 60))             # requests per minute, 0: unlimited
+# Seconds between re-reads of the registered-name column for the duplicate check
+NAME_RECONCILE_INTERVAL = float(_env('NAME_RECONCILE_INTERVAL', 300))
+
+# Player tokens: allocation log and starting width (widens automatically when full)
+TOKEN_LOG = _env('TOKEN_LOG', 'tokens.log')
+TOKEN_WIDTH = int(_env('TOKEN_WIDTH', 3))
+
+# Registrant photos: directory, format ('png', 'jpg' or 'webp') and quality (jpg/webp).
+# CAPTURE_SHARD_DIGITS > 0 files them under subdirectories named after the
+# token's last digits instead of flat as captures/<token>.png.
+CAPTURE_DIR = _env('CAPTURE_DIR', 'captures')
+CAPTURE_FORMAT = _env('CAPTURE_FORMAT', 'png')
+CAPTURE_QUALITY = int(_env('CAPTURE_QUALITY', 90))
+CAPTURE_SHARD_DIGITS = int(_env('CAPTURE_SHARD_DIGITS', 0))
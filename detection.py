@@ -0,0 +1,244 @@
+import cv2 as cv
+import numpy as np
+
+# Shared face and smile detection helpers for the kiosk scripts.
+# Both take the grayscale frame so callers convert once per frame.
+
+FACE_SCALE_FACTOR, FACE_MIN_NEIGHBORS = 1.3, 5
+SMILE_SCALE_FACTOR, SMILE_MIN_NEIGHBORS = 1.8, 20
+
+
+def detect_faces(face_cascade, gray, scale=1.0,
+                 scale_factor=FACE_SCALE_FACTOR, min_neighbors=FACE_MIN_NEIGHBORS,
+                 min_size=None, max_size=None):
+    """Runs the face cascade on a downscaled copy of gray.
+
+    min_size/max_size are (w, h) bounds in full-resolution pixels. Returns
+    boxes as an (N, 4) int array of x, y, w, h in full-resolution
+    coordinates, so crops taken from the original frame keep full quality.
+    """
+    scale = min(scale, 1.0)
+    small_min = _scaled_size(min_size, scale)
+    small_max = _scaled_size(max_size, scale)
+    if scale == 1.0:
+        faces = face_cascade.detectMultiScale(gray, scale_factor, min_neighbors,
+                                              minSize=small_min, maxSize=small_max)
+        return np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+
+    small = cv.resize(gray, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+    faces = face_cascade.detectMultiScale(small, scale_factor, min_neighbors,
+                                          minSize=small_min, maxSize=small_max)
+    if len(faces) == 0:
+        return np.empty((0, 4), dtype=np.int32)
+
+    boxes = np.round(np.asarray(faces, dtype=np.float32) / scale).astype(np.int32)
+    height, width = gray.shape[:2]
+    boxes[:, 0] = np.clip(boxes[:, 0], 0, width - 1)
+    boxes[:, 1] = np.clip(boxes[:, 1], 0, height - 1)
+    boxes[:, 2] = np.minimum(boxes[:, 2], width - boxes[:, 0])
+    boxes[:, 3] = np.minimum(boxes[:, 3], height - boxes[:, 1])
+    return boxes
+
+
+def _scaled_size(size, scale):
+    # (0, 0) is OpenCV's "no bound"
+    if size is None:
+        return (0, 0)
+    return (int(size[0] * scale), int(size[1] * scale))
+
+
+def detect_smile(smile_cascade, face_gray,
+                 scale_factor=SMILE_SCALE_FACTOR, min_neighbors=SMILE_MIN_NEIGHBORS, profile=None):
+    """Returns True if the smile cascade fires inside a full-resolution face crop.
+
+    With a DetectionProfile only the mouth region of the crop is searched.
+    """
+    min_size = (0, 0)
+    if profile is not None:
+        height, width = face_gray.shape[:2]
+        x1, y1, x2, y2 = profile.mouth_region(width, height)
+        face_gray = face_gray[y1:y2, x1:x2]
+        min_size = profile.smile_min_size(width)
+    smiles = smile_cascade.detectMultiScale(face_gray, scale_factor, min_neighbors, minSize=min_size)
+    return len(smiles) > 0
+
+
+class DetectionProfile:
+    """Cascade search bounds derived from the kiosk camera geometry.
+
+    A face of width `face_width` metres seen from between `min_distance` and
+    `max_distance` metres by a camera with horizontal field of view
+    `hfov_deg` spans a predictable range of pixels, so the face cascade
+    does not need to try scales outside it. Smiles are searched only in the
+    lower part of the face box.
+    """
+
+    def __init__(self, frame_width, frame_height, hfov_deg=60.0, min_distance=0.4,
+                 max_distance=1.5, face_width=0.16, margin=0.3, mouth_top=0.55, mouth_side=0.15):
+        focal_px = (frame_width / 2.0) / np.tan(np.radians(hfov_deg) / 2.0)
+        # Haar boxes include some forehead and cheek, hence the margin
+        smallest = focal_px * face_width / max_distance * (1.0 - margin)
+        largest = focal_px * face_width / min_distance * (1.0 + margin)
+        limit = min(frame_width, frame_height)
+        smallest = int(max(24, min(smallest, limit)))
+        largest = int(max(smallest, min(largest, limit)))
+        self.face_min_size = (smallest, smallest)
+        self.face_max_size = (largest, largest)
+        self.mouth_top = mouth_top
+        self.mouth_side = mouth_side
+
+    def mouth_region(self, width, height):
+        """Returns x1, y1, x2, y2 of the mouth search area within a width x height face box."""
+        return (int(width * self.mouth_side), int(height * self.mouth_top),
+                int(width * (1.0 - self.mouth_side)), height)
+
+    def smile_min_size(self, face_width):
+        # A smile is at least a quarter of the face wide; the cascade window is 2:1
+        w = int(face_width * 0.25)
+        return (w, w // 2)
+
+    def describe(self):
+        return (f"face size {self.face_min_size[0]}-{self.face_max_size[0]}px, "
+                f"smile search from {self.mouth_top:.0%} of face height")
+
+
+class FaceTracker:
+    """Limits the face cascade to a window around the last known face.
+
+    A registrant standing at the desk barely moves between frames, so after
+    a hit only the previous box grown by `padding` on each side is searched.
+    A miss inside the window falls back to a full-frame scan on the same
+    frame, and a full scan is forced every `rescan_every` frames so a second
+    person stepping in is not ignored for long.
+    """
+
+    def __init__(self, face_cascade, scale=1.0, padding=0.5, rescan_every=15,
+                 scale_factor=FACE_SCALE_FACTOR, min_neighbors=FACE_MIN_NEIGHBORS, profile=None):
+        self.face_cascade = face_cascade
+        self.scale = scale
+        self.detect_kwargs = {'scale_factor': scale_factor, 'min_neighbors': min_neighbors}
+        if profile is not None:
+            self.detect_kwargs.update(min_size=profile.face_min_size, max_size=profile.face_max_size)
+        self.padding = padding
+        self.rescan_every = rescan_every
+        self.last_box = None
+        self._since_rescan = 0
+        self.frames = 0
+        self.window_hits = 0
+        self.window_misses = 0
+        self.rescans = 0
+
+    def reset(self):
+        self.last_box = None
+        self._since_rescan = 0
+
+    def _window(self, shape):
+        x, y, w, h = self.last_box
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        height, width = shape[:2]
+        x1, y1 = max(x - pad_x, 0), max(y - pad_y, 0)
+        x2, y2 = min(x + w + pad_x, width), min(y + h + pad_y, height)
+        return x1, y1, x2, y2
+
+    def _full_scan(self, gray):
+        self.rescans += 1
+        self._since_rescan = 0
+        return detect_faces(self.face_cascade, gray, self.scale, **self.detect_kwargs)
+
+    def detect(self, gray):
+        """Returns face boxes in full-frame coordinates, like detect_faces()."""
+        self.frames += 1
+        self._since_rescan += 1
+        if self.last_box is None or self._since_rescan >= self.rescan_every:
+            faces = self._full_scan(gray)
+        else:
+            x1, y1, x2, y2 = self._window(gray.shape)
+            faces = detect_faces(self.face_cascade, gray[y1:y2, x1:x2], self.scale, **self.detect_kwargs)
+            if len(faces) > 0:
+                self.window_hits += 1
+                faces[:, 0] += x1
+                faces[:, 1] += y1
+            else:
+                self.window_misses += 1
+                faces = self._full_scan(gray)
+        self.last_box = tuple(int(v) for v in faces[0]) if len(faces) > 0 else None
+        return faces
+
+    def stats(self):
+        windowed = self.window_hits + self.window_misses
+        return {
+            'frames': self.frames,
+            'window_hit_rate': self.window_hits / windowed if windowed else 0.0,
+            'window_miss_rate': self.window_misses / windowed if windowed else 0.0,
+            'rescan_rate': self.rescans / self.frames if self.frames else 0.0,
+        }
+
+
+class PresenceGate:
+    """Skips the cascades while nobody is in front of the kiosk.
+
+    Each frame is shrunk to a thumbnail and compared with a slowly updated
+    background. Detection runs when enough of the thumbnail changed, while a
+    face was seen in the last `hold_frames` detections, and at least every
+    `max_skip` frames so a registrant standing perfectly still is not missed.
+    """
+
+    def __init__(self, thumb_width=80, pixel_threshold=25, changed_fraction=0.02,
+                 hold_frames=30, max_skip=30, alpha=0.05):
+        self.thumb_width = thumb_width
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.hold_frames = hold_frames
+        self.max_skip = max_skip
+        self.alpha = alpha
+        self._background = None
+        self._hold = 0
+        self._skipped_run = 0
+        self.frames = 0
+        self.skipped = 0
+        self.motion_triggers = 0
+
+    def reset(self):
+        self._background = None
+        self._hold = 0
+        self._skipped_run = 0
+
+    def _motion(self, gray):
+        height, width = gray.shape[:2]
+        thumb_size = (self.thumb_width, max(1, self.thumb_width * height // width))
+        thumb = cv.resize(gray, thumb_size, interpolation=cv.INTER_AREA)
+        thumb = cv.GaussianBlur(thumb, (5, 5), 0)
+        if self._background is None or self._background.shape != thumb.shape:
+            self._background = thumb.astype(np.float32)
+            return True
+        diff = cv.absdiff(thumb, cv.convertScaleAbs(self._background))
+        changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        cv.accumulateWeighted(thumb, self._background, self.alpha)
+        return changed >= self.changed_fraction
+
+    def should_detect(self, gray):
+        self.frames += 1
+        motion = self._motion(gray)
+        if motion:
+            self.motion_triggers += 1
+        if motion or self._hold > 0 or self._skipped_run >= self.max_skip:
+            self._skipped_run = 0
+            return True
+        self._skipped_run += 1
+        self.skipped += 1
+        return False
+
+    def update(self, face_found):
+        """Feeds back whether the detection that was allowed found a face."""
+        if face_found:
+            self._hold = self.hold_frames
+        elif self._hold > 0:
+            self._hold -= 1
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'skip_rate': self.skipped / self.frames if self.frames else 0.0,
+            'motion_triggers': self.motion_triggers,
+        }
@@ -0,0 +1,240 @@
+import numpy as np
+import time
+import queue
+import logging
+import multiprocessing as mp
+from collections import namedtuple
+from multiprocessing import shared_memory, resource_tracker
+
+from detectors import create_backend, make_profile
+
+# Face and smile detection in worker processes, fed through shared memory.
+#
+# The UI loop copies each grayscale frame into a free slot of a shared
+# memory block and queues only the slot number. submit() never waits: when
+# every slot is still being worked on, the frame is dropped. latest() returns
+# the newest finished result, so the display keeps its own frame rate no
+# matter how long a detection takes. Each result carries the sequence number
+# submit() returned for its frame, so the caller can apply the box to the
+# frame it was found in rather than to a newer one.
+#
+# Every frame is queued to one particular worker. If a worker dies, the slots
+# it was holding are reclaimed and frames go to the remaining workers; once
+# none is left, alive is False and the caller can detect in-process.
+#
+# Workers are forked, and start() must run before the caller starts any
+# other thread: a child forked while another thread holds a lock (logging,
+# a queue, OpenCV's thread pool) can deadlock on it. spawn and forkserver
+# would re-import the main script, and the kiosk scripts open the camera
+# and windows at import. Each worker sizes its detection profile from the
+# first frame it gets, so the pool can start before the camera is open.
+
+DetectionResult = namedtuple('DetectionResult', ['seq', 'box', 'smile', 'latency'])
+
+
+def _attach(name):
+    try:
+        # The parent owns the block; keep the child's resource tracker out of it
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attach; undo it so the block is not
+        # reported as leaked, or unlinked early, when the worker exits
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _worker(task_queue, result_queue, backend_name, scale, padding, rescan_every):
+    backend = create_backend(backend_name)
+    tracker = None
+    frame_shape = None
+    segments = {}
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        shm_name, slot, slot_bytes, shape, seq = task
+        if shm_name not in segments:
+            segments[shm_name] = _attach(shm_name)
+        gray = np.ndarray(shape, dtype=np.uint8, buffer=segments[shm_name].buf, offset=slot * slot_bytes)
+        if shape != frame_shape:
+            frame_shape = shape
+            backend.profile = make_profile(shape[1], shape[0])
+            tracker = backend.make_tracker(scale, padding, rescan_every)
+        box, smile = None, False
+        try:
+            faces = tracker.detect(gray)
+            if len(faces) > 0:
+                x, y, w, h = (int(v) for v in faces[0])
+                box = (x, y, w, h)
+                smile = backend.detect_smile(gray[y:y+h, x:x+w])
+        except Exception as e:
+            logging.error(f"Detection worker failed on frame {seq}: {e}")
+        del gray
+        # time.monotonic() is system-wide, so the parent can compare it with its own
+        result_queue.put((seq, slot, box, smile, time.monotonic()))
+    for shm in segments.values():
+        shm.close()
+
+
+class DetectionService:
+    """Pool of detection worker processes with a bounded number of in-flight frames."""
+
+    def __init__(self, backend_name, workers=2, max_in_flight=None, scale=1.0, padding=0.5, rescan_every=15):
+        if 'fork' not in mp.get_all_start_methods():
+            raise RuntimeError("detection workers need the fork start method, not available on this platform")
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self._worker_args = (backend_name, scale, padding, rescan_every)
+        self._ctx = mp.get_context('fork')
+        self._results = self._ctx.Queue()
+        self._procs = []
+        self._task_queues = []
+        self._dead = set()    # indexes of workers that exited
+        self._shm = None
+        self._slot_bytes = 0
+        self._free_slots = list(range(self.max_in_flight))
+        self._assigned = {}   # slot -> (worker index, seq) while a worker holds it
+        self._submitted_at = {}
+        self._seq = 0
+        self._latest = None
+        self._min_seq = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+
+    def _fork_worker(self, i):
+        tasks = self._ctx.Queue()
+        proc = self._ctx.Process(target=_worker, name=f"DetectionWorker-{i}",
+                                 args=(tasks, self._results) + self._worker_args, daemon=True)
+        proc.start()
+        return proc, tasks
+
+    def start(self):
+        """Forks the workers; call before any other thread is started."""
+        for i in range(self.workers):
+            proc, tasks = self._fork_worker(i)
+            self._procs.append(proc)
+            self._task_queues.append(tasks)
+        logging.info(f"Detection service started with {self.workers} workers, "
+                     f"{self.max_in_flight} frames in flight")
+        return self
+
+    @property
+    def alive(self):
+        """False once every worker has died."""
+        return len(self._dead) < len(self._procs)
+
+    @property
+    def in_flight(self):
+        return self.max_in_flight - len(self._free_slots)
+
+    def _allocate(self, nbytes):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+        self._slot_bytes = nbytes
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes * self.max_in_flight)
+
+    def submit(self, gray):
+        """Queues a grayscale frame for detection.
+
+        Returns the frame's sequence number, which its DetectionResult will
+        carry, or None if the frame was dropped.
+        """
+        self.poll()
+        if not self._free_slots or not self.alive:
+            self.dropped += 1
+            return None
+        if gray.nbytes > self._slot_bytes:
+            # Frame size changed; wait for the old block to drain before replacing it
+            if self.in_flight:
+                self.dropped += 1
+                return None
+            self._allocate(gray.nbytes)
+        slot = self._free_slots.pop()
+        dest = np.ndarray(gray.shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self._slot_bytes)
+        dest[...] = gray
+        del dest
+        self._seq += 1
+        # The live worker with the fewest frames queued takes it
+        load = {i: 0 for i in range(self.workers) if i not in self._dead}
+        for worker, _ in self._assigned.values():
+            load[worker] += 1
+        worker = min(load, key=load.get)
+        self._assigned[slot] = (worker, self._seq)
+        self._submitted_at[self._seq] = time.monotonic()
+        self._task_queues[worker].put((self._shm.name, slot, self._slot_bytes, gray.shape, self._seq))
+        self.submitted += 1
+        return self._seq
+
+    def _reap(self):
+        """Reclaims the slots of workers that died.
+
+        No replacement is forked: by now the caller has other threads running.
+        """
+        for i, proc in enumerate(self._procs):
+            if i in self._dead or proc.is_alive():
+                continue
+            self._dead.add(i)
+            lost = [slot for slot, (worker, _) in self._assigned.items() if worker == i]
+            for slot in lost:
+                _, seq = self._assigned.pop(slot)
+                self._submitted_at.pop(seq, None)
+                self._free_slots.append(slot)
+            logging.error(f"Detection worker {proc.name} exited with code {proc.exitcode}; "
+                          f"reclaimed {len(lost)} slots, {len(self._procs) - len(self._dead)} workers left")
+
+    def poll(self):
+        """Collects finished results without blocking."""
+        while True:
+            try:
+                seq, slot, box, smile, finished = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if self._assigned.get(slot, (None, None))[1] != seq:
+                continue   # the slot was reclaimed from a dead worker after it sent this
+            del self._assigned[slot]
+            self._free_slots.append(slot)
+            self.completed += 1
+            # Submit to worker finish; time spent waiting for this poll() is not detection
+            latency = finished - self._submitted_at.pop(seq, finished)
+            # Workers can finish out of order; never go back to an older frame
+            if seq <= self._min_seq:
+                continue
+            if self._latest is None or seq > self._latest.seq:
+                self._latest = DetectionResult(seq, box, smile, latency)
+        self._reap()
+
+    def latest(self):
+        """Returns the newest DetectionResult, or None if nothing has finished yet."""
+        self.poll()
+        return self._latest
+
+    def clear(self):
+        """Forgets the last result so a new registrant cannot inherit an old smile."""
+        self.poll()
+        self._latest = None
+        self._min_seq = self._seq
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'in_flight': self.in_flight,
+            'workers_alive': len(self._procs) - len(self._dead),
+        }
+
+    def close(self):
+        for tasks in self._task_queues:
+            tasks.put(None)
+        for proc in self._procs:
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.terminate()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        logging.info(f"Detection service stopped: {self.stats()}")
@@ -0,0 +1,113 @@
+import cv2 as cv
+import os
+import logging
+
+import config
+from detection import DetectionProfile, FaceTracker, detect_smile
+
+# Interchangeable face/smile detector backends. final.py asks for the one named
+# in config.DETECTOR_BACKEND (REGDESK_DETECTOR_BACKEND), so switching a desk to
+# LBP or to the models bundled in Recognition_models/ needs no code change.
+#
+#   haar   OpenCV's bundled Haar face + smile cascades (the original setup)
+#   local  Haar face + smile cascades from config.MODEL_DIR, or config.FACE_MODEL
+#   lbp    LBP frontal-face cascade (several times faster) + Haar smile cascade.
+#          The cascade is not in the opencv-python wheel; copy it from
+#          OpenCV's data/lbpcascades into MODEL_DIR first.
+#
+# Compare them with: python bench_detect.py <corpus> --variants backend:haar backend:lbp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LBP_FACE_FILES = ['lbpcascade_frontalface_improved.xml', 'lbpcascade_frontalface.xml']
+
+
+def _model_dir():
+    return config.MODEL_DIR if os.path.isabs(config.MODEL_DIR) else os.path.join(HERE, config.MODEL_DIR)
+
+
+def _load(path):
+    cascade = cv.CascadeClassifier(path)
+    if cascade.empty():
+        raise ValueError(f"Failed to load cascade classifier: {path}")
+    return cascade
+
+
+class CascadeBackend:
+    """A face cascade, a smile cascade and the detectMultiScale settings that suit them."""
+
+    def __init__(self, name, face_path, smile_path, face_scale_factor=1.3, face_min_neighbors=5):
+        self.name = name
+        self.face_path = face_path
+        self.smile_path = smile_path
+        self.face_scale_factor = face_scale_factor
+        self.face_min_neighbors = face_min_neighbors
+        self.face_cascade = _load(face_path)
+        self.smile_cascade = _load(smile_path)
+        self.profile = None
+        logging.info(f"Detector backend '{name}' loaded from {face_path}")
+
+    def make_tracker(self, scale=1.0, padding=0.5, rescan_every=15):
+        return FaceTracker(self.face_cascade, scale, padding, rescan_every,
+                           self.face_scale_factor, self.face_min_neighbors, self.profile)
+
+    def detect_smile(self, face_gray):
+        return detect_smile(self.smile_cascade, face_gray, profile=self.profile)
+
+
+def _haar_backend():
+    return CascadeBackend('haar',
+                          cv.data.haarcascades + 'haarcascade_frontalface_default.xml',
+                          cv.data.haarcascades + 'haarcascade_smile.xml')
+
+
+def _local_backend():
+    model_dir = _model_dir()
+    face_path = config.FACE_MODEL or os.path.join(model_dir, 'haarcascade_frontalface_default.xml')
+    return CascadeBackend('local', face_path, os.path.join(model_dir, 'haarcascade_smile.xml'))
+
+
+def _lbp_backend():
+    # opencv-python wheels ship only the Haar cascades, so look next to the
+    # local models first and then in a full OpenCV install's data directory
+    search_dirs = [_model_dir(), os.path.join(cv.data.haarcascades, os.pardir, 'lbpcascades')]
+    candidates = [os.path.join(d, f) for d in search_dirs for f in LBP_FACE_FILES]
+    face_path = next((p for p in candidates if os.path.exists(p)), None)
+    if face_path is None:
+        raise FileNotFoundError(f"No LBP face cascade found; copy {LBP_FACE_FILES[0]} from OpenCV's "
+                                f"data/lbpcascades into {_model_dir()}")
+    # LBP features are coarser, so a finer scale step keeps the hit rate up
+    return CascadeBackend('lbp', face_path, cv.data.haarcascades + 'haarcascade_smile.xml',
+                          face_scale_factor=1.1, face_min_neighbors=3)
+
+
+BACKENDS = {
+    'haar': _haar_backend,
+    'local': _local_backend,
+    'lbp': _lbp_backend,
+}
+
+
+def make_profile(frame_width, frame_height):
+    """Builds the DetectionProfile for the kiosk layout in config.py, or None if disabled."""
+    if not config.DETECTION_PROFILE:
+        return None
+    profile = DetectionProfile(frame_width, frame_height, config.CAMERA_HFOV_DEG,
+                               config.STAND_DISTANCE_MIN, config.STAND_DISTANCE_MAX,
+                               mouth_top=config.MOUTH_TOP)
+    logging.info(f"Detection profile for {frame_width}x{frame_height}: {profile.describe()}")
+    return profile
+
+
+def create_backend(name=None, profile=None):
+    """Builds the named backend.
+
+    Raises ValueError for an unknown name and the loader's error if the
+    backend's model files are missing, so a desk configured for one backend
+    never quietly runs another.
+    """
+    name = name or config.DETECTOR_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown detector backend '{name}' (choose from {', '.join(BACKENDS)})")
+    backend = BACKENDS[name]()
+    backend.profile = profile
+    return backend
@@ -0,0 +1,190 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import logging
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+# Local stand-in for the Google Sheets values API, for exercising the
+# registration path without network access or credentials.
+#
+# Serves values.get and values.append for any spreadsheet id, keeping one
+# in-memory table per sheet. latency adds a delay to every request and
+# error_rate fails that fraction of requests with a 503, to imitate slow or
+# flaky venue Wi-Fi. quota caps requests per minute the way the real API
+# does, answering 429 RESOURCE_EXHAUSTED beyond it. Point the kiosk at it
+# with REGDESK_SHEETS_ENDPOINT=http://127.0.0.1:8765/, or use the 'fake'
+# registry backend, which runs one in-process.
+#
+#   python fake_sheets.py --port 8765 --latency 0.8 --error-rate 0.2 --quota 60
+
+VALUES_PATH = re.compile(r'^/v4/spreadsheets/([^/]+)/values/(.+?)(:append)?$')
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + ord(ch) - ord('A') + 1
+    return index - 1
+
+
+def parse_range(a1):
+    """Splits 'Sheet1!A:B' into ('Sheet1', first column, last column)."""
+    sheet, _, cells = a1.rpartition('!')
+    match = re.match(r'^([A-Za-z]+)\d*(?::([A-Za-z]+)\d*)?$', cells)
+    if not match:
+        return sheet or 'Sheet1', 0, None
+    first = _column_index(match.group(1))
+    last = _column_index(match.group(2)) if match.group(2) else first
+    return sheet or 'Sheet1', first, last
+
+
+class FakeSheets:
+    def __init__(self, latency=0.0, error_rate=0.0, quota=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota = quota         # requests per minute, 0 for unlimited
+        self._recent = deque()     # times of requests within the last minute
+        self.sheets = {}   # sheet name -> list of rows
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.appends = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def admit(self):
+        """Counts a request against the quota; False if it must be throttled."""
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            if not self.quota:
+                return True
+            while self._recent and now - self._recent[0] >= 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.quota:
+                self.throttled += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def rows(self, sheet='Sheet1'):
+        with self.lock:
+            return [list(row) for row in self.sheets.get(sheet, [])]
+
+    def get(self, a1):
+        sheet, first, last = parse_range(a1)
+        with self.lock:
+            rows = self.sheets.get(sheet, [])
+            values = [row[first:None if last is None else last + 1] for row in rows]
+        return {'range': a1, 'majorDimension': 'ROWS', 'values': [row for row in values if row]}
+
+    def append(self, spreadsheet_id, a1, values):
+        sheet, first, _ = parse_range(a1)
+        with self.lock:
+            rows = self.sheets.setdefault(sheet, [])
+            start = len(rows) + 1
+            for row in values:
+                rows.append([''] * first + [str(cell) for cell in row])
+            self.appends += 1
+        return {
+            'spreadsheetId': spreadsheet_id,
+            'tableRange': a1,
+            'updates': {
+                'spreadsheetId': spreadsheet_id,
+                'updatedRange': f"{sheet}!A{start}:B{start + len(values) - 1}",
+                'updatedRows': len(values),
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'FakeSheets/1.0'
+
+    def log_message(self, format, *args):
+        logging.debug("fake_sheets: " + format % args)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._reply(status, {'error': {'code': status, 'message': message}})
+
+    def _route(self):
+        sheets = self.server.sheets
+        if not sheets.admit():
+            self._reply(429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                                        'message': 'Quota exceeded for requests per minute.'}})
+            return None
+        if sheets.latency:
+            time.sleep(sheets.latency)
+        if sheets.error_rate and random.random() < sheets.error_rate:
+            with sheets.lock:
+                sheets.errors += 1
+            self._error(503, 'The service is currently unavailable.')
+            return None
+        match = VALUES_PATH.match(unquote(urlparse(self.path).path))
+        if not match:
+            self._error(404, f'Unknown path {self.path}')
+            return None
+        return match
+
+    def do_GET(self):
+        match = self._route()
+        if match is None:
+            return
+        if match.group(3):
+            self._error(405, 'append requires POST')
+            return
+        self._reply(200, self.server.sheets.get(match.group(2)))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        match = self._route()
+        if match is None:
+            return
+        if not match.group(3):
+            self._error(405, 'only values:append is supported')
+            return
+        try:
+            values = json.loads(body or b'{}').get('values', [])
+        except ValueError:
+            self._error(400, 'Invalid JSON payload')
+            return
+        self._reply(200, self.server.sheets.append(match.group(1), match.group(2), values))
+
+
+def serve(host='127.0.0.1', port=0, sheets=None):
+    """Starts the server on a background thread; returns (server, endpoint URL)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.sheets = sheets or FakeSheets()
+    threading.Thread(target=server.serve_forever, name="FakeSheets", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the Google Sheets values API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests failed with 503")
+    parser.add_argument('--quota', type=int, default=0, help="requests per minute before 429s (0: unlimited)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server, endpoint = serve(args.host, args.port, FakeSheets(args.latency, args.error_rate, args.quota))
+    logging.info(f"Fake Sheets listening on {endpoint}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
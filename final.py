@@ -1,75 +1,135 @@
+import time
+startup_started = time.perf_counter()   # for the time-to-first-frame report
 import cv2 as cv
 import numpy as np
 import random
-import string
-import time
-import pyttsx3
 import tkinter as tk
-import os
 from tkinter import messagebox
 import logging
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+from frame_source import open_frame_source
+from assets import assets
+from compositor import Compositor
+from present import Presenter
+from detection import PresenceGate
+from detectors import create_backend, make_profile
+import config
+from detection_service import DetectionService
+from speech import SpeechWorker
+from registration_db import RegistrationDB, RegistrySync
+from registry import create_registry
+from token_allocator import TokenAllocator
+from capture_store import CaptureStore
+from name_index import NameIndex
+from pacing import DetectionCadence, LoopScheduler
+from startup import Startup
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Google Sheets API setup
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-SPREADSHEET_ID = '1y56bOATGzEmlZVMfir7WB2QHs32iyKh7fK5g4FuewJI'
-RANGE_NAME = 'Sheet1!A:B'  # Columns A (Name) and B (Token)
-CHECK_RANGE = 'Sheet1!A:A'  # Range to check for existing names (column A)
-CREDENTIALS_FILE = 'asthra-participant-list-55acad99e49d.json'
+# Configuration
+ROI_X, ROI_Y = 645, 130
+ROI_WIDTH, ROI_HEIGHT = 630, 530
+FRAME_W, FRAME_H = 666, 887
+FRAME_POS = (1920 - FRAME_W - 150, 100)
+
+# Startup: steps that do not depend on each other run concurrently, and the
+# START screen goes up as soon as its image is decoded. Tk and the OpenCV
+# window stay on the main thread.
+startup = Startup()
 
-def init_google_sheets():
+# Detection worker processes (REGDESK_DETECTION_WORKERS=0 keeps detection in this process).
+# They are forked, so they start first, before any thread below exists.
+detection_service = None
+detection_frames = {}   # seq -> frame submitted to the workers, until its result is in
+if config.DETECTION_WORKERS > 0:
     try:
-        creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-        service = build('sheets', 'v4', credentials=creds)
-        logging.info("Google Sheets API initialized successfully")
-        return service
+        detection_service = startup.run('workers', lambda: DetectionService(
+            config.DETECTOR_BACKEND, workers=config.DETECTION_WORKERS,
+            max_in_flight=config.DETECTION_MAX_IN_FLIGHT, scale=config.DETECT_SCALE,
+            padding=config.TRACK_PADDING, rescan_every=config.TRACK_RESCAN_EVERY).start())
     except Exception as e:
-        logging.error(f"Failed to initialize Google Sheets API: {e}")
-        return None
+        logging.error(f"Failed to start detection workers, detecting in-process: {e}")
+        detection_service = None
 
-sheets_service = init_google_sheets()
+def init_records():
+    # Registry backend (Google Sheets by default, see registry.py)
+    registry = create_registry(config.REGISTRY_BACKEND)
+    # Registrations are committed to a local database and synced to the registry in the background
+    registration_db = RegistrationDB(config.REGISTRATION_DB)
+    registration_db.import_journal(config.REGISTRATION_JOURNAL, 'sheets')
+    registry_sync = RegistrySync(registration_db, registry.append, target=registry.name).start()
+    # Names registered at other desks, loaded once and kept in sync for the duplicate check
+    name_index = NameIndex(registry.names, reconcile_interval=config.NAME_RECONCILE_INTERVAL).start()
+    # Photos are encoded and written in the background
+    capture_store = CaptureStore(config.CAPTURE_DIR, config.CAPTURE_FORMAT, config.CAPTURE_QUALITY,
+                                 config.CAPTURE_SHARD_DIGITS).start()
+    # Tokens that already have a photo are never handed out again
+    token_allocator = TokenAllocator(config.TOKEN_LOG, width=config.TOKEN_WIDTH,
+                                     issued=capture_store.tokens() + registration_db.tokens())
+    return registry, registration_db, registry_sync, name_index, capture_store, token_allocator
 
-# Initialize text-to-speech engine
-try:
-    engine = pyttsx3.init()
-    logging.info("Text-to-speech engine initialized")
-except Exception as e:
-    logging.error(f"Failed to initialize text-to-speech: {e}")
-    exit()
+def init_detector():
+    # Face/smile detector, backend chosen by REGDESK_DETECTOR_BACKEND. Its
+    # detection profile is set once the camera's frame size is known.
+    detector = create_backend(config.DETECTOR_BACKEND)
+    presence_gate = PresenceGate(changed_fraction=config.MOTION_CHANGED_FRACTION,
+                                 max_skip=config.MOTION_MAX_SKIP) if config.MOTION_GATE else None
+    logging.info("Cascade classifiers loaded")
+    return detector, presence_gate
 
-# Load Haar cascade classifiers
-try:
-    face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.xml')
-    if face_cascade.empty() or smile_cascade.empty():
-        raise ValueError("Failed to load cascade classifiers")
-    logging.info("Haar cascade classifiers loaded")
-except Exception as e:
-    logging.error(f"Error loading cascades: {e}")
-    exit()
+def source_frame_size(cap):
+    # The camera may not honour the requested size and a recording may have
+    # been made at another, so go by an actual frame
+    ret, frame = cap.read()
+    if not ret:
+        logging.warning(f"No frame yet - sizing detection for {ROI_WIDTH}x{ROI_HEIGHT}")
+        return ROI_WIDTH, ROI_HEIGHT
+    height, width = frame.shape[:2]
+    return width, height
 
-# Load background images
-try:
-    start_image = cv.imread('Background/Desktop Inital.png')
-    smile_image = cv.imread('Background/Desktop input.png')
-    final_bg = cv.imread('Background/Desktop final.png')
-    if start_image is None or smile_image is None or final_bg is None:
+def init_backgrounds():
+    smile_image = assets.get('Background/Desktop input.png')
+    final_bg = assets.get('Background/Desktop final.png')
+    recognition_bg = assets.get('Background/new.png')
+    if smile_image is None or final_bg is None or recognition_bg is None:
         raise FileNotFoundError("One or more background images not found")
-    logging.info("Background images loaded")
+    return smile_image, final_bg, recognition_bg
+
+def init_camera():
+    # Webcam (or a recorded session when REGDESK_REPLAY_DIR is set)
+    cap = open_frame_source(ROI_WIDTH, ROI_HEIGHT)
+    if not cap.isOpened():
+        raise ValueError("Could not open frame source")
+    cap.start()
+    logging.info("Frame source initialized")
+    return cap
+
+def init_window():
+    root = tk.Tk()
+    root.withdraw()
+    cv.namedWindow('Monitoring', cv.WINDOW_NORMAL)
+    cv.setWindowProperty('Monitoring', cv.WND_PROP_FULLSCREEN, cv.WINDOW_FULLSCREEN)
+    cv.setWindowProperty('Monitoring', cv.WND_PROP_TOPMOST, 1)
+    logging.info("Tkinter and OpenCV window initialized")
+    return root
+
+startup.task('start screen', assets.get, 'Background/Desktop Inital.png')
+startup.task('camera', init_camera)
+startup.task('detector', init_detector)
+startup.task('backgrounds', init_backgrounds)
+startup.task('records', init_records)
+
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = startup.run('speech', lambda: SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start())
+cadence = DetectionCadence(config.TARGET_FPS, config.DETECT_MAX_INTERVAL)
+
+try:
+    root = startup.run('window', init_window)
 except Exception as e:
-    logging.error(f"Error loading background images: {e}")
+    logging.error(f"Error configuring window: {e}")
     exit()
 
-# Configuration
-ROI_X, ROI_Y = 645, 130
-ROI_WIDTH, ROI_HEIGHT = 630, 530
-FRAME_W, FRAME_H = 666, 887
-FRAME_POS = (1920 - FRAME_W - 150, 100)
-
 # State machine constants
 START, SMILE_SCREEN, FACE_RECOGNITION, FINAL_DISPLAY = 0, 1, 2, 3
 
@@ -83,97 +143,98 @@ name_dialog_opened = False
 smile_start_time = None
 final_display_start_time = None
 show_restart_button = False
+last_detection = (None, False)
+capture_count = 0
 
-# Initialize Tkinter
-root = tk.Tk()
-root.withdraw()
-logging.info("Tkinter initialized")
+def generate_token():
+    return token_allocator.allocate()
 
-# Configure main window
-try:
-    cv.namedWindow('Monitoring', cv.WINDOW_NORMAL)
-    cv.setWindowProperty('Monitoring', cv.WND_PROP_FULLSCREEN, cv.WINDOW_FULLSCREEN)
-    cv.setWindowProperty('Monitoring', cv.WND_PROP_TOPMOST, 1)
-    logging.info("OpenCV window configured")
-except Exception as e:
-    logging.error(f"Error configuring OpenCV window: {e}")
-    exit()
-
-# Webcam setup
-try:
-    cap = cv.VideoCapture(0)
-    if not cap.isOpened():
-        raise ValueError("Could not open webcam")
-    cap.set(cv.CAP_PROP_FRAME_WIDTH, ROI_WIDTH)
-    cap.set(cv.CAP_PROP_FRAME_HEIGHT, ROI_HEIGHT)
-    logging.info("Webcam initialized")
-except Exception as e:
-    logging.error(f"Error initializing webcam: {e}")
-    exit()
+def check_duplicate_name(name):
+    if registration_db.has_name(name):
+        return True
+    if not name_index.loaded:
+        logging.warning("Registered names not loaded yet - checking against local registrations only")
+    return name_index.contains(name)
 
-def generate_token(length=3):
-    return ''.join(random.choices(string.digits, k=length))
+def register_participant(name, token):
+    registration_db.add(name, token)
+    registry_sync.notify()
+    logging.info(f"Registered {name}, {token} ({registry_sync.depth} waiting to sync to {registry.name})")
 
-def check_duplicate_name(name):
-    if sheets_service is None:
-        logging.error("Google Sheets service not available - skipping duplicate check")
-        return False
-    try:
-        result = sheets_service.spreadsheets().values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=CHECK_RANGE
-        ).execute()
-        values = result.get('values', [])
-        existing_names = [row[0].strip() for row in values if row]  # Assuming name is in column A
-        logging.debug(f"Existing names in sheet: {existing_names}")
-        return name.strip() in existing_names
-    except Exception as e:
-        logging.error(f"Error checking duplicate name in Google Sheets: {e}")
-        return False
+def find_face_and_smile(gray, frame):
+    # Returns (face box or None, smiled, frame the box was found in). With
+    # worker processes the result is the newest finished one, which may be
+    # for a frame or two behind the display; that frame is returned with it.
+    global detection_service
+    if detection_service is not None and not detection_service.alive:
+        logging.error("All detection workers have exited - detecting in-process")
+        detection_service.close()
+        detection_service = None
+        detection_frames.clear()
+    if detection_service is not None:
+        seq = detection_service.submit(gray)
+        if seq is not None:
+            detection_frames[seq] = frame
+        result = detection_service.latest()
+        if result is None:
+            return None, False, None
+        for old_seq in [s for s in detection_frames if s < result.seq]:
+            del detection_frames[old_seq]
+        return result.box, result.smile, detection_frames.get(result.seq)
+    faces = face_tracker.detect(gray)
+    if len(faces) == 0:
+        return None, False, frame
+    x, y, w, h = faces[0]
+    return faces[0], detector.detect_smile(gray[y:y+h, x:x+w]), frame
 
-def append_to_google_sheets(name, token):
-    if sheets_service is None:
-        logging.error("Google Sheets service not available - skipping append")
-        return
-    try:
-        values = [[name, token]]
-        body = {'values': values}
-        logging.debug(f"Appending data to Google Sheets: {values}")
-        result = sheets_service.spreadsheets().values().append(
-            spreadsheetId=SPREADSHEET_ID,
-            range=RANGE_NAME,
-            valueInputOption='RAW',
-            body=body
-        ).execute()
-        logging.info(f"Successfully appended {name}, {token} to Google Sheets: {result}")
-    except Exception as e:
-        logging.error(f"Error appending to Google Sheets: {e}")
+def draw_face_shape(image, face, shape_type, color):
+    x, y, w, h = face
+    if shape_type == 'square':
+        cv.rectangle(image, (x, y), (x+w, y+h), color, 3)
+    elif shape_type == 'triangle':
+        pt1 = (x + w//2, y)
+        pt2 = (x, y+h)
+        pt3 = (x+w, y+h)
+        cv.drawContours(image, [np.array([pt1, pt2, pt3])], 0, color, 3)
+    elif shape_type == 'circle':
+        cv.circle(image, (x+w//2, y+h//2), min(w,h)//2, color, 3)
 
 def detect_face_and_smile(frame):
-    global smile_detected, captured_frame
+    global smile_detected, captured_frame, capture_count, last_detection
     smile_detected = False
     try:
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+        source = None  # frame the face box belongs to, if it is still available
+        if cadence.should_detect():
+            started = time.perf_counter()
+            gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+            if presence_gate is None or presence_gate.should_detect(gray):
+                face, smiled, source = find_face_and_smile(gray, frame)
+                if presence_gate is not None:
+                    presence_gate.update(face is not None)
+            else:
+                face, smiled = None, False  # empty scene, cascades skipped
+            last_detection = (face, smiled)
+            cadence.detect_done(time.perf_counter() - started)
+        else:
+            face, smiled = last_detection  # under load, reuse the previous result
         frame_copy = frame.copy()  # Initialize frame_copy here
-        if len(faces) > 0:
-            x, y, w, h = faces[0]
+        if face is not None:
+            x, y, w, h = face
             shape_type = random.choice(['square', 'triangle', 'circle'])
             color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+            draw_face_shape(frame_copy, face, shape_type, color)
             
-            if shape_type == 'square':
-                cv.rectangle(frame_copy, (x, y), (x+w, y+h), color, 3)
-            elif shape_type == 'triangle':
-                pt1 = (x + w//2, y)
-                pt2 = (x, y+h)
-                pt3 = (x+w, y+h)
-                cv.drawContours(frame_copy, [np.array([pt1, pt2, pt3])], 0, color, 3)
-            elif shape_type == 'circle':
-                cv.circle(frame_copy, (x+w//2, y+h//2), min(w,h)//2, color, 3)
-            
-            captured_frame = frame_copy[y:y+h, x:x+w]
-            if len(smile_cascade.detectMultiScale(gray[y:y+h, x:x+w], 1.8, 20)) > 0:
-                smile_detected = True
+            # The photo is only cut from the frame the box was found in, never
+            # from a newer frame the registrant may have moved in
+            if source is frame:
+                captured_frame = frame_copy[y:y+h, x:x+w]
+                capture_count += 1
+            elif source is not None:
+                source_copy = source.copy()
+                draw_face_shape(source_copy, face, shape_type, color)
+                captured_frame = source_copy[y:y+h, x:x+w]
+                capture_count += 1
+            smile_detected = smiled
         return frame_copy
     except Exception as e:
         logging.error(f"Error in detect_face_and_smile: {e}")
@@ -240,16 +301,12 @@ def open_name_dialog():
         
         participant_name = temp_name
         player_token = generate_token()
-        picture_path = f"captures/{player_token}.png"
         
         if captured_frame is not None:
-            if not os.path.exists("captures"):
-                os.makedirs("captures")
-            cv.imwrite(picture_path, captured_frame)
-            logging.info(f"Saved image: {picture_path}")
+            capture_store.save(player_token, captured_frame)
         
-        # Append to Google Sheets
-        append_to_google_sheets(participant_name, player_token)
+        # Committed locally; the registry (Google Sheets) is updated in the background
+        register_participant(participant_name, player_token)
         
         name_dialog_opened = False
         name_window.destroy()  # Close dialog only on successful registration
@@ -302,20 +359,30 @@ def show_final_display():
     return display_frame
 
 def reset_to_start():
-    global current_state, smile_detected, participant_name, captured_frame, player_token, name_dialog_opened, final_display_start_time, show_restart_button
+    global current_state, smile_detected, participant_name, captured_frame, player_token, name_dialog_opened, final_display_start_time, show_restart_button, last_detection
     current_state = START
     smile_detected = False
     participant_name = ""
     captured_frame = None
     player_token = ""
+    speech.cancel()
     name_dialog_opened = False
     final_display_start_time = None
     show_restart_button = False
-    logging.info("Reset to START state")
+    last_detection = (None, False)
+    face_tracker.reset()
+    if detection_service is not None:
+        detection_service.clear()
+        detection_frames.clear()
+    logging.info(f"Reset to START state - face tracker stats: {face_tracker.stats()}")
+    if presence_gate is not None:
+        presence_gate.reset()
+        logging.info(f"Presence gate stats: {presence_gate.stats()}")
 
 def mouse_callback(event, x, y, flags, param):
     global current_state, smile_start_time
     if event == cv.EVENT_LBUTTONDOWN:
+        loop_scheduler.input_event()
         if current_state == START:
             start_button_coords = param['start_button_coords']
             x1, y1, x2, y2 = start_button_coords
@@ -336,80 +403,165 @@ def mouse_callback(event, x, y, flags, param):
                 button_y - padding - text_height <= y <= button_y + padding):
                 reset_to_start()
 
+# The START screen never changes; render it once and show it while the rest loads
+try:
+    start_image = startup.result('start screen')
+    if start_image is None:
+        raise FileNotFoundError("Background/Desktop Inital.png not found")
+except Exception as e:
+    logging.error(f"Error loading background images: {e}")
+    exit()
+start_display, start_button_coords = draw_start_button(start_image.copy())
+cv.imshow('Monitoring', start_display)
+cv.waitKey(1)
+logging.info(f"START screen shown after {startup.elapsed():.2f}s")
+
+# Wait for the remaining steps, keeping the window responsive meanwhile
+pump_window = lambda: cv.waitKey(10)
+try:
+    detector, presence_gate = startup.result('detector', pump_window)
+except Exception as e:
+    logging.error(f"Error loading cascades: {e}")
+    exit()
+try:
+    smile_image, final_bg, recognition_bg = startup.result('backgrounds', pump_window)
+    recognition_screen = Compositor(recognition_bg)
+    logging.info(f"Background images loaded\n{assets.report()}")
+except Exception as e:
+    logging.error(f"Error loading background images: {e}")
+    exit()
+try:
+    cap = startup.result('camera', pump_window)
+except Exception as e:
+    logging.error(f"Error initializing webcam: {e}")
+    exit()
+# Face size bounds follow the frames the camera actually delivers
+frame_size = source_frame_size(cap)
+detector.profile = make_profile(*frame_size)
+face_tracker = detector.make_tracker(config.DETECT_SCALE, config.TRACK_PADDING, config.TRACK_RESCAN_EVERY)
+try:
+    registry, registration_db, registry_sync, name_index, capture_store, token_allocator = \
+        startup.result('records', pump_window)
+except Exception as e:
+    logging.error(f"Error opening registration records: {e}")
+    cap.release()
+    speech.close()
+    exit()
+
+startup.report()
+startup.close()
+
+# START only becomes clickable once everything it leads to is ready
+cv.setMouseCallback('Monitoring', mouse_callback, {'start_button_coords': start_button_coords})
+# Static screens only need to keep up with input; camera screens run at TARGET_FPS.
+# The scheduler also dispatches Tk events, so the name dialog is served while
+# the loop sleeps instead of by a root.update() at the top of every frame.
+loop_scheduler = LoopScheduler({
+    START: 1 / config.STATIC_FPS,
+    SMILE_SCREEN: 1 / config.TARGET_FPS,
+    FACE_RECOGNITION: 1 / config.TARGET_FPS,
+    FINAL_DISPLAY: 1 / config.STATIC_FPS,
+}, tk_root=root)
+root.bind_all('<KeyPress>', loop_scheduler.input_event, add='+')
+root.bind_all('<ButtonPress>', loop_scheduler.input_event, add='+')
+presenter = Presenter('Monitoring', on_present=loop_scheduler.frame_presented)
+
+def show_start_screen(pending_uploads):
+    if not pending_uploads:
+        return start_display
+    # Rows not yet synced to the registry, so staff can see when the venue network is down
+    image = start_display.copy()
+    cv.putText(image, f"{pending_uploads} registrations waiting to upload", (30, 1050),
+               cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return image
+
+read_failing = False
+
+def note_frame_read(ret):
+    # Logs when frames stop and start arriving rather than on every pass
+    global read_failing
+    if not ret and not read_failing:
+        logging.error("Failed to read frame from webcam - waiting for frames")
+    elif ret and read_failing:
+        logging.info("Frames from webcam resumed")
+    read_failing = not ret
+
 # Main loop
 logging.info("Starting main loop")
 while True:
     try:
-        root.update()
+        frame_started = time.perf_counter()
         
         if current_state == START:
-            start_display = start_image.copy()
-            start_display, start_button_coords = draw_start_button(start_display)
-            cv.imshow('Monitoring', start_display)
-            cv.setMouseCallback('Monitoring', mouse_callback, {'start_button_coords': start_button_coords})
+            pending_uploads = registry_sync.depth
+            presenter.show((START, pending_uploads), lambda: show_start_screen(pending_uploads))
         
         elif current_state == SMILE_SCREEN:
             ret, frame = cap.read()
-            if not ret:
-                logging.error("Failed to read frame from webcam")
-                cv.imshow('Monitoring', smile_image)
-                continue
-            
-            cv.imshow('Monitoring', smile_image)
-            frame = cv.flip(frame, 1)
-            frame = detect_face_and_smile(frame)
-            
-            if time.time() - smile_start_time > 3:
-                engine.say("Please smile!")
-                engine.runAndWait()
-                smile_start_time = time.time()
-                logging.debug("Voice prompt triggered")
-            
-            if smile_detected:
-                current_state = FACE_RECOGNITION
-                open_name_dialog()
-                logging.info("Smile detected - Transition to FACE_RECOGNITION")
+            note_frame_read(ret)
+            presenter.show((SMILE_SCREEN,), lambda: smile_image)
+            # Without a frame the screen stays up and the loop still ticks,
+            # so events are handled and 'q' quits while the camera is out
+            if ret:
+                frame = cv.flip(frame, 1)
+                frame = detect_face_and_smile(frame)
+                
+                if time.time() - smile_start_time > 3:
+                    speech.say(SMILE_PROMPT)
+                    smile_start_time = time.time()
+                    logging.debug("Voice prompt triggered")
+                
+                if smile_detected:
+                    speech.cancel()
+                    current_state = FACE_RECOGNITION
+                    open_name_dialog()
+                    logging.info("Smile detected - Transition to FACE_RECOGNITION")
         
         elif current_state == FACE_RECOGNITION:
-            bg_image = cv.imread('Background/new.png')
-            if bg_image is None:
-                logging.error("Failed to load new.png")
-                break
             ret, frame = cap.read()
+            note_frame_read(ret)
             
-            if not ret:
-                logging.error("Failed to read frame from webcam")
-                continue
-            
-            frame = cv.flip(frame, 1)
-            frame = detect_face_and_smile(frame)
-            
-            frame_resized = cv.resize(frame, (ROI_WIDTH, ROI_HEIGHT))
-            bg_image[ROI_Y:ROI_Y+ROI_HEIGHT, ROI_X:ROI_X+ROI_WIDTH] = frame_resized
+            # Without a frame the last one stays on screen
+            if ret:
+                frame = cv.flip(frame, 1)
+                frame = detect_face_and_smile(frame)
+                recognition_screen.paste(frame, ROI_X, ROI_Y, ROI_WIDTH, ROI_HEIGHT)
             
             if participant_name:
                 text = f"Player: {participant_name}"
                 (tw, th), _ = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 1.2, 2)
                 text_x = ROI_X + (ROI_WIDTH - tw) // 2
                 text_y = ROI_Y + ROI_HEIGHT + 50
-                cv.putText(bg_image, text, (text_x, text_y),
-                          cv.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+                recognition_screen.label('player', text, (text_x, text_y),
+                                         cv.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            else:
+                recognition_screen.label('player', '', None)
             
-            cv.imshow('Monitoring', bg_image)
+            presenter.present(recognition_screen.canvas)
             
             if participant_name and player_token:
                 current_state = FINAL_DISPLAY
                 final_display_start_time = time.time()
+                # Names vary per registrant, so this one is synthesized live
+                speech.say(f"Welcome, {participant_name}!")
                 logging.info("Name and token set - Transition to FINAL_DISPLAY")
         
         elif current_state == FINAL_DISPLAY:
             if final_display_start_time and time.time() - final_display_start_time > 5:
                 show_restart_button = True
             
-            display_frame = show_final_display()
-            cv.imshow('Monitoring', display_frame)
+            # Rebuilt only when the capture, name, token or restart button changes
+            presenter.show((FINAL_DISPLAY, capture_count, participant_name, player_token, show_restart_button),
+                           show_final_display)
+
+        if current_state in (SMILE_SCREEN, FACE_RECOGNITION):
+            cadence.frame_done(time.perf_counter() - frame_started)
 
-        key = cv.waitKey(1)
+        key = loop_scheduler.tick(current_state)
+        if startup_started is not None:
+            # The first frame is on screen once the tick has pumped the window
+            logging.info(f"Time to first frame: {time.perf_counter() - startup_started:.2f}s")
+            startup_started = None
         if key == ord('q'):
             logging.info("Quitting program")
             break
@@ -419,7 +571,26 @@ while True:
         break
 
 # Cleanup
+logging.info(f"Detection cadence stats: {cadence.stats()}")
+logging.info(f"Present stats: {presenter.stats()}")
+logging.info(f"Loop scheduler stats: {loop_scheduler.stats()}")
+logging.info(f"Registry sync stats: {registry_sync.stats()}")
+logging.info(f"Token allocator stats: {token_allocator.stats()}")
+logging.info(f"Capture store stats: {capture_store.stats()}")
+logging.info(f"Name index stats: {name_index.stats()}")
+logging.info(f"Speech stats: {speech.stats()}")
+if presence_gate is not None:
+    logging.info(f"Presence gate stats: {presence_gate.stats()}")
 cap.release()
+speech.close()
+registry_sync.close()
+registration_db.close()
+registry.close()
+token_allocator.close()
+capture_store.close()
+name_index.close()
+if detection_service is not None:
+    detection_service.close()
 cv.destroyAllWindows()
 root.destroy()
 logging.info("Program terminated")
\ No newline at end of file
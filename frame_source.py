@@ -0,0 +1,203 @@
+import cv2 as cv
+import os
+import csv
+import time
+import queue
+import threading
+import logging
+
+import config
+from capture import ThreadedCapture
+
+# A recorded session is a directory of lossless PNG frames plus an index:
+#   <session>/index.csv         seq,timestamp,file
+#   <session>/frames/000001.png
+INDEX_FILE = 'index.csv'
+FRAMES_DIR = 'frames'
+
+
+class SessionRecorder:
+    """Writes timestamped frames to a session directory on a background thread.
+
+    write() copies the frame and returns immediately so recording a live
+    session does not add PNG encode time to the main loop.
+    """
+
+    def __init__(self, path, max_pending=64):
+        self.path = path
+        os.makedirs(os.path.join(path, FRAMES_DIR), exist_ok=True)
+        self._index = open(os.path.join(path, INDEX_FILE), 'w', newline='')
+        self._writer = csv.writer(self._index)
+        self._writer.writerow(['seq', 'timestamp', 'file'])
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._seq = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self._thread.start()
+        logging.info(f"Recording session to {path}")
+
+    def write(self, frame, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        self._seq += 1
+        try:
+            self._queue.put_nowait((self._seq, timestamp, frame.copy()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            seq, timestamp, frame = item
+            name = f"{seq:06d}.png"
+            cv.imwrite(os.path.join(self.path, FRAMES_DIR, name), frame)
+            self._writer.writerow([seq, f"{timestamp:.6f}", f"{FRAMES_DIR}/{name}"])
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._index.close()
+        logging.info(f"Recorded {self._seq - self.dropped} frames to {self.path} ({self.dropped} dropped)")
+
+
+def load_session(path):
+    """Returns [(timestamp, file_path), ...] for a recorded session."""
+    with open(os.path.join(path, INDEX_FILE), newline='') as f:
+        rows = list(csv.DictReader(f))
+    return [(float(row['timestamp']), os.path.join(path, row['file'])) for row in rows]
+
+
+class ReplaySource:
+    """Plays a recorded session back through the cv.VideoCapture read() API.
+
+    With realtime=True frames are released on the original timeline, so the
+    main loop sees the same frame it would have seen live at that moment.
+    With realtime=False every call returns the next frame, for max-speed runs.
+    """
+
+    def __init__(self, path, realtime=True, loop=False, preload=True):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self._entries = load_session(path)
+        self._frames = [cv.imread(p) for _, p in self._entries] if preload else None
+        self._pos = -1
+        self._t0 = None
+        self.frame_count = 0
+
+    def isOpened(self):
+        return len(self._entries) > 0
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        logging.info(f"Replaying {len(self._entries)} frames from {self.path}")
+        return self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _frame(self, i):
+        if self._frames is not None:
+            return self._frames[i]
+        return cv.imread(self._entries[i][1])
+
+    def _target_index(self):
+        if not self.realtime:
+            return self._pos + 1
+        if self._t0 is None:
+            self.start()
+        elapsed = time.perf_counter() - self._t0
+        first = self._entries[0][0]
+        duration = self._entries[-1][0] - first
+        if self.loop and duration > 0:
+            elapsed %= duration
+        i = self._pos if self._pos >= 0 else 0
+        if elapsed < self._entries[i][0] - first:
+            i = 0  # wrapped around
+        while i + 1 < len(self._entries) and self._entries[i + 1][0] - first <= elapsed:
+            i += 1
+        if not self.loop and i == len(self._entries) - 1 and i == self._pos:
+            return len(self._entries)  # last frame already delivered
+        return i
+
+    def read(self):
+        if not self._entries:
+            return False, None
+        i = self._target_index()
+        if i >= len(self._entries):
+            if not self.loop:
+                return False, None
+            i = 0
+        if i != self._pos:
+            self.frame_count += 1
+        self._pos = i
+        return True, self._frame(i)
+
+    def release(self):
+        self._frames = None
+
+
+class RecordingSource:
+    """Wraps a frame source and records every frame the main loop reads from it."""
+
+    def __init__(self, source, path):
+        self.source = source
+        self.recorder = SessionRecorder(path)
+        self._last_count = None
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def start(self):
+        self.source.start()
+        return self
+
+    def read(self):
+        ret, frame = self.source.read()
+        # A threaded capture hands back the same frame until a new one arrives
+        if ret and self.source.frame_count != self._last_count:
+            self._last_count = self.source.frame_count
+            self.recorder.write(frame)
+        return ret, frame
+
+    @property
+    def frame_count(self):
+        return self.source.frame_count
+
+    def release(self):
+        self.source.release()
+        self.recorder.close()
+
+
+def open_frame_source(width=None, height=None):
+    """Returns the frame source selected in config.py: a replayed session or the webcam."""
+    if config.REPLAY_DIR:
+        source = ReplaySource(config.REPLAY_DIR, realtime=config.REPLAY_REALTIME, loop=config.REPLAY_LOOP)
+    else:
+        source = ThreadedCapture(config.CAMERA_INDEX, width, height)
+    if config.RECORD_DIR:
+        source = RecordingSource(source, config.RECORD_DIR)
+    return source
+
+
+if __name__ == '__main__':
+    # Record a session from the webcam without the kiosk UI:
+    #   python frame_source.py <session_dir> [seconds]
+    import sys
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) < 2:
+        print("Usage: python frame_source.py <session_dir> [seconds]")
+        sys.exit(1)
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    cap = RecordingSource(ThreadedCapture(config.CAMERA_INDEX, 630, 530), sys.argv[1])
+    if not cap.isOpened():
+        print("Error: Could not open webcam")
+        sys.exit(1)
+    cap.start()
+    end = time.time() + seconds
+    while time.time() < end:
+        cap.read()
+        time.sleep(0.001)
+    cap.release()
@@ -1,5 +1,7 @@
 import cv2 as cv
 import numpy as np
+from assets import assets
+from compositor import Compositor
 
 # Load Haar cascade classifiers for face and smile detection
 face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
@@ -7,14 +9,18 @@ smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.x
 
 
 # Load images (Only Start and Smile images are needed initially)
-start_image = cv.imread('Background/Desktop Inital.png')  # Replace with your actual file path
-smile_image = cv.imread('Background/Desktop Squid Game.png')  # Replace with your actual file path
+start_image = assets.get('Background/Desktop Inital.png')  # Replace with your actual file path
+smile_image = assets.get('Background/Desktop Squid Game.png')  # Replace with your actual file path
 #recognition_image = cv.imread('White Screen.png')  # Replace with your actual file path (NOT USED directly)
 
 
-if start_image is None or smile_image is None: # removed recognition_image
+recognition_image = assets.get('Background/Desktop Squid Game.png', (1920, 1080))
+
+
+if start_image is None or smile_image is None or recognition_image is None:
     print("Error: Could not load one or more images. Check file paths.")
     exit()
+recognition_screen = Compositor(recognition_image)
 
 
 # State machine states
@@ -89,13 +95,6 @@ while True:
         print("Current state: FACE_RECOGNITION")
         # --- Webcam Overlay Code Starts Here ---
 
-        # Load the background image (load it here, only when needed)
-        image_background = cv.imread('Background/Desktop Squid Game.png')
-        if image_background is None:
-            print("Error: Could not load image. Please check the file path.")
-            exit()
-        image_background = cv.resize(image_background, (1920, 1080))
-
         success, frame = cap.read()  # Capture webcam frame HERE! VERY IMPORTANT!
         if not success:
             print("Error: Could not read frame from webcam.")
@@ -103,32 +102,12 @@ while True:
 
         frame = cv.flip(frame, 1)
 
-        # Resize the frame to fit the ROI dimensions
-        frame_resized = cv.resize(frame, (roi_width, roi_height))
-
-        # Get the frame dimensions
-        frame_height, frame_width, _ = frame_resized.shape
-
-        # Calculate the center offset
-        x_offset = (roi_width - frame_width) // 2
-        y_offset = (roi_height - frame_height) // 2
-
-        # Create a black border on frame_resized to fit the ROI dimensions
-        border_top = y_offset
-        border_bottom = y_offset
-        border_left = x_offset
-        border_right = x_offset
-        frame_with_border = cv.copyMakeBorder(frame_resized, border_top, border_bottom, border_left, border_right,
-                                           cv.BORDER_CONSTANT, value=[0, 0, 0])
-
-        # Calculate the valid region to copy to avoid exceeding image boundaries
-        bg_height, bg_width, _ = image_background.shape
-
-        # Copy the valid region of the webcam feed to the background
-        image_background[roi_y:roi_y + roi_height, roi_x:roi_x + roi_width] = frame_with_border
+        # Resize the frame straight into the ROI of the persistent canvas;
+        # nothing else on the screen changes between frames
+        recognition_screen.paste(frame, roi_x, roi_y, roi_width, roi_height)
 
         # Display the combined image
-        cv.imshow('Monitoring', image_background)
+        cv.imshow('Monitoring', recognition_screen.canvas)
 
         # --- Webcam Overlay Code Ends Here ---
 
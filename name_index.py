@@ -0,0 +1,70 @@
+import threading
+import unicodedata
+import logging
+
+# In-memory index of registered names for the duplicate check.
+#
+# The registry's name column is loaded once in the background and re-read
+# every reconcile_interval seconds to pick up rows added or removed at other
+# desks, so a duplicate check never waits on the network. Lookups are set
+# membership on a normalized key. Names registered at this desk are checked
+# in the local database (registration_db.py), which has them before the sync
+# reaches the registry.
+
+
+def normalize_name(name):
+    """Key used for comparisons: NFKC, case-folded, inner whitespace collapsed."""
+    return ' '.join(unicodedata.normalize('NFKC', name).split()).casefold()
+
+
+class NameIndex:
+    def __init__(self, fetch_names, reconcile_interval=300.0):
+        self.fetch_names = fetch_names   # callable() -> iterable of names, raises on failure
+        self.reconcile_interval = reconcile_interval
+        self._names = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.loaded = False
+        self.reconciles = 0
+        self.failures = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="NameIndex", daemon=True)
+        self._thread.start()
+        return self
+
+    def reconcile(self):
+        names = {normalize_name(name) for name in self.fetch_names() if name and name.strip()}
+        with self._lock:
+            self._names = names
+        self.loaded = True
+        self.reconciles += 1
+        logging.info(f"Name index reconciled: {len(names)} names in the registry")
+
+    def _run(self):
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                self.failures += 1
+                logging.error(f"Failed to load registered names: {e}")
+            if self._stop.wait(self.reconcile_interval):
+                break
+
+    def contains(self, name):
+        key = normalize_name(name)
+        with self._lock:
+            return key in self._names
+
+    def __len__(self):
+        with self._lock:
+            return len(self._names)
+
+    def stats(self):
+        return {'names': len(self), 'loaded': self.loaded,
+                'reconciles': self.reconciles, 'failures': self.failures}
+
+    def close(self):
+        self._stop.set()
+
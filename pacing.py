@@ -0,0 +1,197 @@
+import cv2 as cv
+import time
+import logging
+import _tkinter
+from collections import deque
+
+# Frame pacing helpers for the kiosk main loops.
+
+
+class DetectionCadence:
+    """Decides how often to run detection so the display holds its target FPS.
+
+    Detection and render cost are tracked as moving averages. Detection then
+    runs on every `interval`-th frame, where `interval` is the smallest value
+    for which render + detect / interval still fits the frame budget. In
+    between, callers reuse the previous result. The interval moves one step
+    at a time, and only after `settle_frames` frames agree, so a single slow
+    frame does not make it oscillate.
+    """
+
+    def __init__(self, target_fps=20.0, max_interval=6, smoothing=0.1, settle_frames=10):
+        self.budget = 1.0 / target_fps
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.settle_frames = settle_frames
+        self.interval = 1
+        self.detect_cost = None
+        self.render_cost = None
+        self._frame = 0
+        self._detect_this_frame = 0.0
+        self._votes = 0
+        self.detections = 0
+        self.reused = 0
+
+    def _average(self, current, sample):
+        # A blocking call elsewhere (TTS, dialogs) should not swing the average
+        sample = min(sample, 4 * self.budget)
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def should_detect(self):
+        """Call once per frame; True when this frame should run detection."""
+        self._frame += 1
+        self._detect_this_frame = 0.0
+        if self._frame % self.interval == 0:
+            self.detections += 1
+            return True
+        self.reused += 1
+        return False
+
+    def detect_done(self, seconds):
+        self._detect_this_frame = seconds
+        self.detect_cost = self._average(self.detect_cost, seconds)
+
+    def frame_done(self, seconds):
+        """Reports the whole frame's duration, detection included."""
+        self.render_cost = self._average(self.render_cost, max(seconds - self._detect_this_frame, 0.0))
+        self._adjust()
+
+    def _wanted_interval(self):
+        if self.detect_cost is None or self.render_cost is None:
+            return 1
+        spare = self.budget - self.render_cost
+        if spare <= 0:
+            return self.max_interval
+        for interval in range(1, self.max_interval + 1):
+            if self.detect_cost / interval <= spare:
+                return interval
+        return self.max_interval
+
+    def _adjust(self):
+        wanted = self._wanted_interval()
+        if wanted == self.interval:
+            self._votes = 0
+            return
+        self._votes += 1 if wanted > self.interval else -1
+        if abs(self._votes) >= self.settle_frames:
+            self.interval += 1 if self._votes > 0 else -1
+            self._votes = 0
+            logging.info(f"Detection cadence now every {self.interval} frame(s) "
+                         f"(detect {self.detect_cost * 1000:.1f} ms, render {self.render_cost * 1000:.1f} ms)")
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'detect_ms': (self.detect_cost or 0.0) * 1000,
+            'render_ms': (self.render_cost or 0.0) * 1000,
+            'detections': self.detections,
+            'reused': self.reused,
+        }
+
+
+class LoopScheduler:
+    """Paces the main loop and drives both OpenCV and Tk events from it.
+
+    tick() is called once at the end of every iteration. It waits out the
+    rest of the state's frame period inside cv.waitKey, which sleeps while
+    dispatching highgui events. With a tk_root the wait is cut into
+    poll_interval slices and pending Tk events are dispatched between them,
+    so the name dialog stays responsive without a root.update() spin. The
+    last millisecond or two is spun so the next frame starts on time. If
+    the iteration overran its deadline, the tick counts a missed deadline
+    and the schedule restarts from now instead of bursting to catch up.
+
+    Input-to-display latency is measured from the latest input_event() (a
+    click or key in either toolkit) to the first event dispatch after the next
+    frame_presented(), which is when the new frame reaches the screen.
+    """
+
+    SPIN_MARGIN = 0.002
+    MAX_TK_EVENTS = 100   # per dispatch, so a flood of events cannot starve the frame
+
+    def __init__(self, periods, default_period=1 / 30.0, tolerance=0.002, tk_root=None, poll_interval=0.005):
+        self.periods = periods
+        self.default_period = default_period
+        self.tolerance = tolerance
+        self.tk_root = tk_root
+        self.poll_interval = poll_interval
+        self._deadline = None
+        self._state = None
+        self._input_at = None
+        self._presented = False
+        self.latencies = deque(maxlen=256)
+        self.ticks = 0
+        self.missed = 0
+        self.worst_overrun = 0.0
+
+    def input_event(self, *args):
+        """Marks user input; accepts and ignores Tk/OpenCV callback arguments."""
+        self._input_at = time.perf_counter()
+
+    def frame_presented(self):
+        if self._input_at is not None:
+            self._presented = True
+
+    def _dispatch_tk(self):
+        if self.tk_root is None:
+            return
+        tk_app = self.tk_root.tk
+        for _ in range(self.MAX_TK_EVENTS):
+            if not tk_app.dooneevent(_tkinter.ALL_EVENTS | _tkinter.DONT_WAIT):
+                break
+
+    def _wait_key(self, ms):
+        self._dispatch_tk()
+        key = cv.waitKey(ms)
+        if self._presented:
+            self.latencies.append(time.perf_counter() - self._input_at)
+            self._input_at = None
+            self._presented = False
+        if key != -1:
+            self.input_event()
+        return key
+
+    def tick(self, state):
+        """Waits out the rest of this state's frame period; returns the cv.waitKey result."""
+        period = self.periods.get(state, self.default_period)
+        now = time.perf_counter()
+        if self._deadline is None or state != self._state:
+            self._deadline = now + period
+            self._state = state
+        self.ticks += 1
+
+        overrun = now - self._deadline
+        if overrun > self.tolerance:
+            self.missed += 1
+            self.worst_overrun = max(self.worst_overrun, overrun)
+            key = self._wait_key(1)
+            self._deadline = time.perf_counter() + period
+            return key
+
+        key = -1
+        while key == -1:
+            remaining = self._deadline - time.perf_counter() - self.SPIN_MARGIN
+            if remaining <= 0:
+                break
+            if self.tk_root is not None:
+                remaining = min(remaining, self.poll_interval)
+            key = self._wait_key(max(int(remaining * 1000), 1))
+        # A key press ends the wait early; handle it now rather than spin
+        if key == -1:
+            while time.perf_counter() < self._deadline:
+                time.sleep(0)
+        self._deadline += period
+        return key
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            'ticks': self.ticks,
+            'missed': self.missed,
+            'miss_rate': self.missed / self.ticks if self.ticks else 0.0,
+            'worst_overrun_ms': self.worst_overrun * 1000,
+            'input_latency_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+            'worst_input_latency_ms': latencies[-1] * 1000 if latencies else None,
+        }
@@ -0,0 +1,62 @@
+import cv2 as cv
+
+# Present layer for the kiosk window.
+#
+# Static screens (START, SMILE_SCREEN, FINAL_DISPLAY) look the same on every
+# loop iteration until something about them changes. show() takes a key that
+# captures everything the screen depends on; while the key is unchanged the
+# previous present stands and neither render nor cv.imshow runs again.
+
+
+class Presenter:
+    def __init__(self, window, on_present=None):
+        self.window = window
+        self.on_present = on_present
+        self._shown_key = None
+        self._renders = {}   # screen -> (key, image), the last render of each screen
+        self.presents = 0
+        self.skipped = 0
+        self.renders = 0
+
+    def show(self, key, render):
+        """Presents a static screen. key[0] names the screen; render() builds its image."""
+        if key == self._shown_key:
+            self.skipped += 1
+            return
+        screen = key[0]
+        cached = self._renders.get(screen)
+        if cached is not None and cached[0] == key:
+            image = cached[1]
+        else:
+            image = render()
+            self.renders += 1
+            self._renders[screen] = (key, image)
+        self._present(image)
+        self._shown_key = key
+
+    def present(self, image):
+        """Presents a live frame; the next static show() will present again."""
+        self._present(image)
+        self._shown_key = None
+
+    def _present(self, image):
+        cv.imshow(self.window, image)
+        self.presents += 1
+        if self.on_present is not None:
+            self.on_present()
+
+    def invalidate(self, screen=None):
+        self._shown_key = None
+        if screen is None:
+            self._renders.clear()
+        else:
+            self._renders.pop(screen, None)
+
+    def stats(self):
+        total = self.presents + self.skipped
+        return {
+            'presents': self.presents,
+            'skipped': self.skipped,
+            'renders': self.renders,
+            'skip_rate': self.skipped / total if total else 0.0,
+        }
@@ -1,17 +1,22 @@
 import cv2 as cv
 import numpy as np
+from assets import assets
 import random  # For random shape selection
 import time
-import pyttsx3
-engine = pyttsx3.init()
+import config
+from speech import SpeechWorker
+
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start()
 
 # Load Haar cascade classifiers for face and smile detection
 face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
 smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.xml')
 
 # Load images
-start_image = cv.imread('Background/Desktop Inital.png')
-smile_image = cv.imread('Background/Desktop Squid Game.png')
+start_image = assets.get('Background/Desktop Inital.png')
+smile_image = assets.get('Background/Desktop Squid Game.png')
 
 if start_image is None or smile_image is None:
     print("Error: Could not load one or more images. Check file paths.")
@@ -114,8 +119,7 @@ while True:
         elapsed_time = time.time() - smile_start_time # calculate the elapsed time, but only when you enter the STATE
 
         if elapsed_time > 5:  # Speak prompt after 5 seconds
-            engine.say("Please smile!")
-            engine.runAndWait() # blocking call
+            speech.say(SMILE_PROMPT)
             smile_start_time = time.time()  # Reset timer
 
         key = cv.waitKey(1) #Wait key pressed
@@ -130,12 +134,12 @@ while True:
         print("Current state: FACE_RECOGNITION")
         # --- Webcam Overlay Code Starts Here ---
 
-        # Load the background image (load it here, only when needed)
-        image_background = cv.imread('Background/Desktop Squid Game.png')
+        # Background image, decoded once and cached by assets.py
+        image_background = assets.get('Background/Desktop Squid Game.png', (1920, 1080))
         if image_background is None:
             print("Error: Could not load image. Please check the file path.")
             exit()
-        image_background = cv.resize(image_background, (1920, 1080))
+        image_background = image_background.copy()  # cached buffer is read-only
 
         success, frame = cap.read()  # Capture webcam frame HERE! VERY IMPORTANT!
         if not success:
@@ -183,4 +187,5 @@ while True:
 
 
 cap.release()  # Release webcam
+speech.close()
 cv.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+import logging
+from name_index import normalize_name
+
+# Local registration database, the system of record for the desk.
+#
+# A registration is a row in an SQLite database in WAL mode. add() commits in
+# a few milliseconds whether or not the venue network is up. Names (by their
+# normalized key) and tokens are indexed, so duplicate checks and lookups are
+# local queries. RegistrySync pushes rows to a registry backend (Google
+# Sheets by default, see registry.py) in the background, in id order, and
+# records how far each target has got in sync_cursors.
+# After a restart it resumes from the cursor. Delivery is at-least-once: a
+# crash between a successful append and the cursor update resends that batch.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    token TEXT NOT NULL UNIQUE,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS registrations_name_key ON registrations (name_key);
+CREATE TABLE IF NOT EXISTS sync_cursors (
+    target TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+'''
+
+
+class RegistrationDB:
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by the UI and sync threads, serialized by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # In WAL mode NORMAL still survives an application crash; only an
+            # OS crash or power loss can roll back the last commits
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    def add(self, name, token):
+        """Records a registration; returns its id. Raises sqlite3.IntegrityError on a reused token."""
+        with self._lock:
+            cur = self._conn.execute(
+                'INSERT INTO registrations (name, name_key, token, created) VALUES (?, ?, ?, ?)',
+                (name, normalize_name(name), token, time.time()))
+            return cur.lastrowid
+
+    def has_name(self, name):
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM registrations WHERE name_key = ? LIMIT 1',
+                                     (normalize_name(name),)).fetchone()
+        return row is not None
+
+    def find_token(self, token):
+        """Returns (name, created) for token, or None."""
+        with self._lock:
+            return self._conn.execute('SELECT name, created FROM registrations WHERE token = ?',
+                                      (token,)).fetchone()
+
+    def tokens(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT token FROM registrations')]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM registrations').fetchone()[0]
+
+    def cursor(self, target):
+        with self._lock:
+            row = self._conn.execute('SELECT last_id FROM sync_cursors WHERE target = ?', (target,)).fetchone()
+        return row[0] if row else 0
+
+    def unsynced(self, target, limit):
+        """Returns up to limit [(id, name, token)] past target's cursor, oldest first."""
+        last_id = self.cursor(target)
+        with self._lock:
+            return self._conn.execute(
+                'SELECT id, name, token FROM registrations WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, limit)).fetchall()
+
+    def pending(self, target):
+        last_id = self.cursor(target)
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM registrations WHERE id > ?', (last_id,)).fetchone()[0]
+
+    def mark_synced(self, target, last_id):
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO sync_cursors (target, last_id, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(target) DO UPDATE SET last_id = excluded.last_id, updated = excluded.updated',
+                (target, last_id, time.time()))
+
+    def import_journal(self, journal_path, target):
+        """One-off migration of a registrations.jsonl write-behind journal."""
+        if not os.path.exists(journal_path) or self.count():
+            return 0
+        sent_seq = 0
+        if os.path.exists(journal_path + '.sent'):
+            with open(journal_path + '.sent') as f:
+                sent_seq = int(f.read().strip() or 0)
+        imported = 0
+        last_sent_id = 0
+        with open(journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    name, token = record['row'][:2]
+                    row_id = self.add(name, token)
+                except (ValueError, KeyError, sqlite3.IntegrityError):
+                    continue
+                imported += 1
+                if record['seq'] <= sent_seq:
+                    last_sent_id = row_id
+        if last_sent_id:
+            self.mark_synced(target, last_sent_id)
+        logging.info(f"Imported {imported} registrations from {journal_path}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RegistrySync:
+    """Pushes registrations past the target's cursor in batches, with retry and backoff."""
+
+    def __init__(self, db, send_batch, target='sheets', batch_size=50, interval=1.0,
+                 min_backoff=1.0, max_backoff=60.0):
+        self.db = db
+        self.send_batch = send_batch   # callable(rows) -> None, raises on failure (a registry's append)
+        self.target = target
+        self.batch_size = batch_size
+        self.interval = interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = None
+        self.sent = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="RegistrySync", daemon=True)
+        self._thread.start()
+        return self
+
+    def notify(self):
+        """Signals that new rows were added, so they are sent without waiting for the interval."""
+        self._wake.set()
+
+    @property
+    def depth(self):
+        return self.db.pending(self.target)
+
+    def _run(self):
+        backoff = 0.0
+        retry_at = 0.0
+        while True:
+            # During a backoff, wait only until the retry is due, even when a
+            # notify() woke the loop partway through it
+            self._wake.wait(max(retry_at - time.monotonic(), 0) if backoff else self.interval)
+            self._wake.clear()
+            closing = self._closing
+            if time.monotonic() < retry_at and not closing:
+                continue   # new registrations do not cut a backoff short
+            batch = self.db.unsynced(self.target, self.batch_size)
+            if not batch:
+                if closing:
+                    break
+                continue
+            try:
+                self.send_batch([[name, token] for _, name, token in batch])
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                backoff = min(max(backoff * 2, self.min_backoff), self.max_backoff)
+                backoff *= random.uniform(0.8, 1.2)
+                retry_at = time.monotonic() + backoff
+                logging.error(f"Failed to send {len(batch)} registrations, retrying in {backoff:.1f}s: {e}")
+                if closing:
+                    break
+                continue
+            backoff = 0.0
+            self.db.mark_synced(self.target, batch[-1][0])
+            self.sent += len(batch)
+            self.batches += 1
+            remaining = self.depth
+            logging.info(f"Sent {len(batch)} registrations ({remaining} still queued)")
+            if remaining:
+                self._wake.set()
+            elif closing:
+                break
+
+    def stats(self):
+        return {'depth': self.depth, 'sent': self.sent, 'batches': self.batches,
+                'failures': self.failures, 'last_error': self.last_error}
+
+    def close(self, timeout=5.0):
+        """Tries to send what is pending for up to timeout seconds; the rest goes on next start."""
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        remaining = self.depth
+        if remaining:
+            logging.warning(f"{remaining} registrations not yet sent; they will be retried on next start")
+
@@ -0,0 +1,194 @@
+import os
+import csv
+import time
+import threading
+import logging
+import config
+
+# Registry backends: where registrations end up after the local database.
+#
+# Each backend has a name (also the sync cursor target, so switching backends
+# does not skip rows), append(rows) that raises on failure so the sync engine
+# retries, and names() returning every registered name for the duplicate
+# index. Pick one with REGDESK_REGISTRY_BACKEND:
+#
+#   sheets  the Google Sheets spreadsheet (SPREADSHEET_ID, CREDENTIALS_FILE)
+#   file    a local CSV file, for running the desk fully offline
+#   fake    Sheets API calls against an in-process fake_sheets.py server with
+#           FAKE_SHEETS_LATENCY / _ERROR_RATE / _QUOTA, for load testing
+#
+# The Sheets client is built on a background thread, so constructing a
+# registry costs nothing at startup. That thread imports googleapiclient,
+# builds the client from the discovery document bundled with the library
+# (no discovery request), and fetches the first access token. Only the
+# sync and name-index threads, which are the first users of the client,
+# wait for it.
+#
+# Those two threads share the client, but an httplib2 connection must not
+# be used by two threads at once. Every request therefore runs on an
+# authorized httplib2.Http that belongs to the calling thread.
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+
+class SheetsRegistry:
+    def __init__(self, spreadsheet_id, append_range, names_range, credentials_file=None,
+                 endpoint=None, name='sheets'):
+        self.name = name
+        self.spreadsheet_id = spreadsheet_id
+        self.append_range = append_range
+        self.names_range = names_range
+        self.credentials_file = credentials_file
+        self.endpoint = endpoint
+        self.connect_time = None
+        self._service = None
+        self._credentials = None
+        self._thread_http = threading.local()
+        self._ready = threading.Event()
+        threading.Thread(target=self._connect, name="SheetsConnect", daemon=True).start()
+
+    def _connect(self):
+        started = time.perf_counter()
+        try:
+            self._service = self._build()
+            self.connect_time = time.perf_counter() - started
+            logging.info(f"Google Sheets API initialized successfully in {self.connect_time:.2f}s")
+        except Exception as e:
+            logging.error(f"Failed to initialize Google Sheets API: {e}")
+        finally:
+            self._ready.set()
+
+    def _build(self):
+        from googleapiclient.discovery import build
+        if self.endpoint:
+            # Local stand-in server (fake_sheets.py); it takes no credentials
+            from google.auth.credentials import AnonymousCredentials
+            self._credentials = AnonymousCredentials()
+            return build('sheets', 'v4', credentials=self._credentials,
+                         client_options={'api_endpoint': self.endpoint},
+                         static_discovery=True, cache_discovery=False)
+        from google.oauth2.service_account import Credentials
+        creds = Credentials.from_service_account_file(self.credentials_file, scopes=SCOPES)
+        self._credentials = creds
+        service = build('sheets', 'v4', credentials=creds, static_discovery=True, cache_discovery=False)
+        try:
+            # Fetch the first token now rather than on the first registration
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+        except Exception as e:
+            logging.warning(f"Could not refresh Google credentials yet, will retry on first request: {e}")
+        return service
+
+    @property
+    def service(self):
+        """The Sheets client, waiting for the background build; None if it failed."""
+        self._ready.wait()
+        return self._service
+
+    def _http(self):
+        """The calling thread's own authorized connection."""
+        http = getattr(self._thread_http, 'http', None)
+        if http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(self._credentials, http=httplib2.Http())
+            self._thread_http.http = http
+        return http
+
+    def append(self, rows):
+        if self.service is None:
+            raise RuntimeError("Google Sheets service not available")
+        self.service.spreadsheets().values().append(
+            spreadsheetId=self.spreadsheet_id,
+            range=self.append_range,
+            valueInputOption='RAW',
+            body={'values': rows}
+        ).execute(http=self._http())
+
+    def names(self):
+        if self.service is None:
+            raise RuntimeError("Google Sheets service not available")
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range=self.names_range
+        ).execute(http=self._http())
+        return [row[0] for row in result.get('values', []) if row]
+
+    def close(self):
+        pass
+
+
+class FileRegistry:
+    """Appends rows to a CSV file; name in the first column."""
+
+    def __init__(self, path, name='file'):
+        self.name = name
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, rows):
+        with self._lock, open(self.path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def names(self):
+        if not os.path.exists(self.path):
+            return []
+        with self._lock, open(self.path, newline='', encoding='utf-8') as f:
+            return [row[0] for row in csv.reader(f) if row]
+
+    def close(self):
+        pass
+
+
+class FakeSheetsRegistry(SheetsRegistry):
+    """SheetsRegistry talking to a fake_sheets.py server started in this process."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, quota=0):
+        from fake_sheets import FakeSheets, serve
+        self.sheets = FakeSheets(latency, error_rate, quota)
+        self.server, endpoint = serve(sheets=self.sheets)
+        logging.info(f"Fake Sheets server on {endpoint} (latency {latency}s, "
+                     f"error rate {error_rate}, quota {quota or 'unlimited'}/min)")
+        super().__init__('fake-spreadsheet', config.SHEETS_APPEND_RANGE, config.SHEETS_NAMES_RANGE,
+                         endpoint=endpoint, name='fake')
+
+    def close(self):
+        self.server.shutdown()
+
+
+def _sheets_registry():
+    return SheetsRegistry(config.SPREADSHEET_ID, config.SHEETS_APPEND_RANGE, config.SHEETS_NAMES_RANGE,
+                          credentials_file=config.CREDENTIALS_FILE, endpoint=config.SHEETS_ENDPOINT)
+
+
+def _file_registry():
+    return FileRegistry(config.REGISTRY_FILE)
+
+
+def _fake_registry():
+    return FakeSheetsRegistry(config.FAKE_SHEETS_LATENCY, config.FAKE_SHEETS_ERROR_RATE,
+                              config.FAKE_SHEETS_QUOTA)
+
+
+BACKENDS = {
+    'sheets': _sheets_registry,
+    'file': _file_registry,
+    'fake': _fake_registry,
+}
+
+
+def create_registry(name=None):
+    """Builds the named registry backend.
+
+    Raises ValueError for an unknown name, so a mistyped backend (say 'fak'
+    during a load test) never writes to the production spreadsheet instead.
+    """
+    name = name or config.REGISTRY_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown registry backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -3,24 +3,31 @@ import numpy as np
 import random
 import string
 import time
-import pyttsx3
 import tkinter as tk
+from capture import ThreadedCapture
+from assets import assets
+from compositor import Compositor
+from speech import SpeechWorker
+import config
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start()
 
 # Load Haar cascade classifiers
 face_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_frontalface_default.xml')
 smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.xml')
 
 # Load background images
-start_image = cv.imread('Background/Desktop Inital.png')
-smile_image = cv.imread('Background/Desktop input.png')
-final_bg = cv.imread('Background/Desktop final.png')
+start_image = assets.get('Background/Desktop Inital.png')
+smile_image = assets.get('Background/Desktop input.png')
+final_bg = assets.get('Background/Desktop final.png')
+recognition_bg = assets.get('Background/new.png')
 
-if start_image is None or smile_image is None or final_bg is None:
+if start_image is None or smile_image is None or final_bg is None or recognition_bg is None:
     print("Error: Could not load background images")
     exit()
+recognition_screen = Compositor(recognition_bg)
 
 # Configuration
 ROI_X, ROI_Y = 645, 130
@@ -51,12 +58,11 @@ cv.namedWindow('Monitoring', cv.WINDOW_NORMAL)
 cv.setWindowProperty('Monitoring', cv.WND_PROP_FULLSCREEN, cv.WINDOW_FULLSCREEN)
 
 # Webcam setup
-cap = cv.VideoCapture(0)
+cap = ThreadedCapture(0, ROI_WIDTH, ROI_HEIGHT)
 if not cap.isOpened():
     print("Error: Could not open webcam")
     exit()
-cap.set(3, ROI_WIDTH)
-cap.set(4, ROI_HEIGHT)
+cap.start()
 
 def generate_token(length=3):
     return ''.join(random.choices(string.digits, k=length))
@@ -184,6 +190,7 @@ def reset_to_start():
     participant_name = ""
     captured_frame = None
     player_token = ""
+    speech.cancel()
     name_dialog_opened = False
     final_display_start_time = None
     show_restart_button = False
@@ -228,16 +235,15 @@ while True:
             
             # Voice prompt every 3 seconds
             if time.time() - smile_start_time > 3:
-                engine.say("Please smile!")
-                engine.runAndWait()
+                speech.say(SMILE_PROMPT)
                 smile_start_time = time.time()
             
             if smile_detected:
+                speech.cancel()
                 current_state = FACE_RECOGNITION
                 open_name_dialog()
     
     elif current_state == FACE_RECOGNITION:
-        bg_image = cv.imread('Background/new.png')
         ret, frame = cap.read()
         
         if ret:
@@ -245,8 +251,7 @@ while True:
             frame = detect_face_and_smile(frame)
             
             # Webcam overlay
-            frame_resized = cv.resize(frame, (ROI_WIDTH, ROI_HEIGHT))
-            bg_image[ROI_Y:ROI_Y+ROI_HEIGHT, ROI_X:ROI_X+ROI_WIDTH] = frame_resized
+            recognition_screen.paste(frame, ROI_X, ROI_Y, ROI_WIDTH, ROI_HEIGHT)
             
             # Add temporary name display
             if participant_name:
@@ -254,10 +259,12 @@ while True:
                 (tw, th), _ = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 1.2, 2)
                 text_x = ROI_X + (ROI_WIDTH - tw) // 2
                 text_y = ROI_Y + ROI_HEIGHT + 50
-                cv.putText(bg_image, text, (text_x, text_y),
-                          cv.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+                recognition_screen.label('player', text, (text_x, text_y),
+                                         cv.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            else:
+                recognition_screen.label('player', '', None)
             
-            cv.imshow('Monitoring', bg_image)
+            cv.imshow('Monitoring', recognition_screen.canvas)
             
             if participant_name and player_token:
                 current_state = FINAL_DISPLAY
@@ -276,5 +283,6 @@ while True:
 
 # Cleanup
 cap.release()
+speech.close()
 cv.destroyAllWindows()
 root.destroy()
\ No newline at end of file
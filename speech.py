@@ -0,0 +1,248 @@
+import os
+import sys
+import queue
+import shutil
+import hashlib
+import subprocess
+import threading
+import wave
+import logging
+
+# Text-to-speech on a dedicated worker thread.
+#
+# The kiosk only queues commands, so speaking never holds up the camera,
+# detection or display: say() returns at once, a prompt already queued or
+# being spoken is not queued again, and cancel() cuts the current prompt
+# short (for example as soon as a smile is detected).
+#
+# pyttsx3 engines are not thread-safe, so only the worker thread touches the
+# engine. cancel() queues a request and raises a flag; a word callback on the
+# worker thread sees the flag and stops the engine mid-utterance.
+#
+# Fixed phrases are rendered to WAV once by PromptCache and played back from
+# disk; only dynamic text (a participant's name) is synthesized live.
+
+
+def _find_player():
+    """Returns a command prefix for a command-line WAV player, or None."""
+    for command in (['aplay', '-q'], ['paplay'], ['afplay']):
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+class WavPlayer:
+    """Plays WAV files asynchronously with winsound or a command-line player."""
+
+    def __init__(self):
+        self._process = None
+        self._winsound = None
+        self._command = None
+        if sys.platform == 'win32':
+            import winsound
+            self._winsound = winsound
+        else:
+            self._command = _find_player()
+
+    @property
+    def available(self):
+        return self._winsound is not None or self._command is not None
+
+    def play(self, path):
+        if self._winsound is not None:
+            self._winsound.PlaySound(path, self._winsound.SND_FILENAME | self._winsound.SND_ASYNC)
+        else:
+            self._process = subprocess.Popen(self._command + [path],
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def stop(self):
+        if self._winsound is not None:
+            self._winsound.PlaySound(None, 0)
+        elif self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+        self._process = None
+
+
+def wav_duration(path):
+    with wave.open(path, 'rb') as f:
+        return f.getnframes() / float(f.getframerate())
+
+
+class PromptCache:
+    """Renders fixed phrases to WAV files, keyed by text and voice settings."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = {}   # text -> (path, duration)
+
+    def key(self, text, voice_id, rate):
+        return hashlib.sha1(f"{voice_id}|{rate}|{text}".encode('utf-8')).hexdigest()[:16]
+
+    def prepare(self, engine, phrases):
+        """Synthesizes any phrase missing from disk; must run on the engine's thread."""
+        os.makedirs(self.directory, exist_ok=True)
+        voice_id = engine.getProperty('voice')
+        rate = engine.getProperty('rate')
+        rendered = 0
+        for text in phrases:
+            path = os.path.join(self.directory, self.key(text, voice_id, rate) + '.wav')
+            if not os.path.exists(path):
+                tmp = path + '.tmp.wav'
+                engine.save_to_file(text, tmp)
+                engine.runAndWait()
+                os.replace(tmp, path)
+                rendered += 1
+            try:
+                self._files[text] = (path, wav_duration(path))
+            except (OSError, EOFError, wave.Error) as e:
+                logging.error(f"Unusable prompt audio for '{text}': {e}")
+        logging.info(f"Prompt cache ready: {len(self._files)} phrases ({rendered} rendered) in {self.directory}")
+
+    def get(self, text):
+        return self._files.get(text)
+
+
+_CANCEL = object()   # queued by cancel(); None shuts the worker down
+
+
+class SpeechWorker:
+    def __init__(self, rate=None, voice=None, prompts=(), cache_dir=None):
+        self.rate = rate
+        self.voice = voice
+        self.prompts = list(prompts)
+        self.cache = PromptCache(cache_dir) if cache_dir and self.prompts else None
+        self._player = None
+        self._commands = queue.Queue()
+        self._pending = set()          # texts queued but not yet spoken
+        self._speaking = None          # text currently being spoken
+        self._lock = threading.Lock()
+        self._stop_playback = threading.Event()
+        self._cancel_requested = threading.Event()
+        self._engine = None
+        self._thread = None
+        self.spoken = 0
+        self.played = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="SpeechWorker", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def available(self):
+        return self._engine is not None
+
+    def _init_engine(self):
+        # pyttsx3 engines must be driven from the thread that created them
+        import pyttsx3
+        engine = pyttsx3.init()
+        if self.rate is not None:
+            engine.setProperty('rate', self.rate)
+        if self.voice is not None:
+            engine.setProperty('voice', self.voice)
+        engine.connect('started-word', self._on_word)
+        return engine
+
+    def _on_word(self, name, location, length):
+        # Runs on the worker thread inside runAndWait(), where stop() is safe
+        if self._cancel_requested.is_set():
+            self._engine.stop()
+
+    def _prepare_cache(self):
+        player = WavPlayer()
+        if not player.available:
+            logging.warning("No audio player found, prompts will be synthesized live")
+            self.cache = None
+            return
+        try:
+            self.cache.prepare(self._engine, self.prompts)
+            self._player = player
+        except Exception as e:
+            logging.error(f"Failed to build prompt cache, prompts will be synthesized live: {e}")
+            self.cache = None
+
+    def _run(self):
+        try:
+            self._engine = self._init_engine()
+            logging.info("Text-to-speech engine initialized")
+        except Exception as e:
+            logging.error(f"Failed to initialize text-to-speech, prompts disabled: {e}")
+        if self._engine is not None and self.cache is not None:
+            self._prepare_cache()
+        while True:
+            text = self._commands.get()
+            if text is None:
+                break
+            if text is _CANCEL:
+                # Anything queued before the request has been skipped or cut short
+                self._cancel_requested.clear()
+                if self._engine is not None:
+                    try:
+                        self._engine.stop()
+                    except Exception as e:
+                        logging.error(f"Failed to stop text-to-speech: {e}")
+                continue
+            with self._lock:
+                if text not in self._pending:
+                    continue   # cancelled while queued
+                self._pending.discard(text)
+                self._speaking = text
+                self._stop_playback.clear()
+            try:
+                cached = self.cache.get(text) if self._player is not None else None
+                if cached is not None:
+                    self._play(*cached)
+                elif self._engine is not None:
+                    self._engine.say(text)
+                    self._engine.runAndWait()
+                    self.spoken += 1
+            except Exception as e:
+                logging.error(f"Text-to-speech failed: {e}")
+            with self._lock:
+                self._speaking = None
+
+    def _play(self, path, duration):
+        self._player.play(path)
+        self.played += 1
+        if self._stop_playback.wait(duration):
+            self._player.stop()
+
+    def say(self, text):
+        """Queues text to be spoken. Returns False if the same text is already queued or playing."""
+        with self._lock:
+            if text in self._pending or text == self._speaking:
+                self.coalesced += 1
+                return False
+            self._pending.add(text)
+            self._commands.put(text)
+        return True
+
+    @property
+    def busy(self):
+        with self._lock:
+            return bool(self._pending) or self._speaking is not None
+
+    def cancel(self):
+        """Drops queued prompts and stops the one being spoken."""
+        with self._lock:
+            if not self._pending and self._speaking is None:
+                return
+            self._pending.clear()
+            if self._speaking is not None:
+                self._stop_playback.set()
+                self._cancel_requested.set()
+            # Queued under the lock so a later say() always comes after it
+            self._commands.put(_CANCEL)
+        self.cancelled += 1
+
+    def stats(self):
+        return {'spoken': self.spoken, 'played': self.played,
+                'coalesced': self.coalesced, 'cancelled': self.cancelled}
+
+    def close(self, timeout=2.0):
+        self.cancel()
+        self._commands.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
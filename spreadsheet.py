@@ -1,44 +1,40 @@
+import time
+startup_started = time.perf_counter()   # for the time-to-first-frame report
 import cv2 as cv
 import numpy as np
 import random
-import string
-import time
-import pyttsx3
 import tkinter as tk
-import os
 from tkinter import messagebox
 import logging
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+from capture import ThreadedCapture
+from assets import assets
+from compositor import Compositor
+from speech import SpeechWorker
+from registration_db import RegistrationDB, RegistrySync
+from registry import create_registry
+from token_allocator import TokenAllocator
+from capture_store import CaptureStore
+from present import Presenter
+from pacing import LoopScheduler
+import config
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Google Sheets API setup
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-SPREADSHEET_ID = '1y56bOATGzEmlZVMfir7WB2QHs32iyKh7fK5g4FuewJI'  # Corrected Spreadsheet ID
-RANGE_NAME = 'Sheet1!A:B'  # Corrected range for Name (A) and Token (B)
-CREDENTIALS_FILE = 'asthra-participant-list-55acad99e49d.json'  # Ensure this is the latest JSON file
-
-def init_google_sheets():
-    try:
-        creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-        service = build('sheets', 'v4', credentials=creds)
-        logging.info("Google Sheets API initialized successfully")
-        return service
-    except Exception as e:
-        logging.error(f"Failed to initialize Google Sheets API: {e}")
-        return None
-
-sheets_service = init_google_sheets()
-
-# Initialize text-to-speech engine
+# Registry backend (Google Sheets by default, see registry.py)
 try:
-    engine = pyttsx3.init()
-    logging.info("Text-to-speech engine initialized")
+    registry = create_registry(config.REGISTRY_BACKEND)
 except Exception as e:
-    logging.error(f"Failed to initialize text-to-speech: {e}")
+    logging.error(f"Error creating registry backend: {e}")
     exit()
+# Registrations are committed to a local database and synced to the registry in the background
+registration_db = RegistrationDB(config.REGISTRATION_DB)
+registration_db.import_journal(config.REGISTRATION_JOURNAL, 'sheets')
+registry_sync = RegistrySync(registration_db, registry.append, target=registry.name).start()
+
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start()
 
 # Load Haar cascade classifiers
 try:
@@ -53,11 +49,13 @@ except Exception as e:
 
 # Load background images
 try:
-    start_image = cv.imread('Background/Desktop Inital.png')
-    smile_image = cv.imread('Background/Desktop input.png')
-    final_bg = cv.imread('Background/Desktop final.png')
-    if start_image is None or smile_image is None or final_bg is None:
+    start_image = assets.get('Background/Desktop Inital.png')
+    smile_image = assets.get('Background/Desktop input.png')
+    final_bg = assets.get('Background/Desktop final.png')
+    recognition_bg = assets.get('Background/new.png')
+    if start_image is None or smile_image is None or final_bg is None or recognition_bg is None:
         raise FileNotFoundError("One or more background images not found")
+    recognition_screen = Compositor(recognition_bg)
     logging.info("Background images loaded")
 except Exception as e:
     logging.error(f"Error loading background images: {e}")
@@ -82,6 +80,7 @@ name_dialog_opened = False
 smile_start_time = None
 final_display_start_time = None
 show_restart_button = False
+capture_count = 0
 
 # Initialize Tkinter
 root = tk.Tk()
@@ -100,39 +99,33 @@ except Exception as e:
 
 # Webcam setup
 try:
-    cap = cv.VideoCapture(0)
+    cap = ThreadedCapture(0, ROI_WIDTH, ROI_HEIGHT)
     if not cap.isOpened():
         raise ValueError("Could not open webcam")
-    cap.set(cv.CAP_PROP_FRAME_WIDTH, ROI_WIDTH)
-    cap.set(cv.CAP_PROP_FRAME_HEIGHT, ROI_HEIGHT)
+    cap.start()
     logging.info("Webcam initialized")
 except Exception as e:
     logging.error(f"Error initializing webcam: {e}")
     exit()
 
-def generate_token(length=3):
-    return ''.join(random.choices(string.digits, k=length))
+# Photos are encoded and written in the background
+capture_store = CaptureStore(config.CAPTURE_DIR, config.CAPTURE_FORMAT, config.CAPTURE_QUALITY,
+                             config.CAPTURE_SHARD_DIGITS).start()
 
-def append_to_google_sheets(name, token):
-    if sheets_service is None:
-        logging.error("Google Sheets service not available - skipping append")
-        return
-    try:
-        values = [[name, token]]
-        body = {'values': values}
-        logging.debug(f"Appending data to Google Sheets: {values}")
-        result = sheets_service.spreadsheets().values().append(
-            spreadsheetId=SPREADSHEET_ID,
-            range=RANGE_NAME,
-            valueInputOption='RAW',
-            body=body
-        ).execute()
-        logging.info(f"Successfully appended {name}, {token} to Google Sheets: {result}")
-    except Exception as e:
-        logging.error(f"Error appending to Google Sheets: {e}")
+# Tokens that already have a photo are never handed out again
+token_allocator = TokenAllocator(config.TOKEN_LOG, width=config.TOKEN_WIDTH,
+                                 issued=capture_store.tokens() + registration_db.tokens())
+
+def generate_token():
+    return token_allocator.allocate()
+
+def register_participant(name, token):
+    registration_db.add(name, token)
+    registry_sync.notify()
+    logging.info(f"Registered {name}, {token} ({registry_sync.depth} waiting to sync to {registry.name})")
 
 def detect_face_and_smile(frame):
-    global smile_detected, captured_frame
+    global smile_detected, captured_frame, capture_count
     smile_detected = False
     try:
         gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
@@ -154,6 +147,7 @@ def detect_face_and_smile(frame):
                 cv.circle(frame_copy, (x+w//2, y+h//2), min(w,h)//2, color, 3)
             
             captured_frame = frame_copy[y:y+h, x:x+w]
+            capture_count += 1
             if len(smile_cascade.detectMultiScale(gray[y:y+h, x:x+w], 1.8, 20)) > 0:
                 smile_detected = True
         return frame_copy
@@ -192,16 +186,12 @@ def open_name_dialog():
         
         participant_name = temp_name
         player_token = generate_token()
-        picture_path = f"captures/{player_token}.png"
         
         if captured_frame is not None:
-            if not os.path.exists("captures"):
-                os.makedirs("captures")
-            cv.imwrite(picture_path, captured_frame)
-            logging.info(f"Saved image: {picture_path}")
+            capture_store.save(player_token, captured_frame)
         
-        # Append to Google Sheets
-        append_to_google_sheets(participant_name, player_token)
+        # Committed locally; the registry (Google Sheets) is updated in the background
+        register_participant(participant_name, player_token)
         
         name_dialog_opened = False
         name_window.destroy()
@@ -260,6 +250,7 @@ def reset_to_start():
     participant_name = ""
     captured_frame = None
     player_token = ""
+    speech.cancel()
     name_dialog_opened = False
     final_display_start_time = None
     show_restart_button = False
@@ -267,6 +258,8 @@ def reset_to_start():
 
 def mouse_callback(event, x, y, flags, param):
     global current_state
+    if event == cv.EVENT_LBUTTONDOWN:
+        loop_scheduler.input_event()
     if current_state == FINAL_DISPLAY and show_restart_button and event == cv.EVENT_LBUTTONDOWN:
         button_text = "RESTART"
         font = cv.FONT_HERSHEY_SIMPLEX
@@ -283,70 +276,89 @@ def mouse_callback(event, x, y, flags, param):
             reset_to_start()
 
 cv.setMouseCallback('Monitoring', mouse_callback)
+# Static screens only need to keep up with input; camera screens run at TARGET_FPS.
+# The scheduler also dispatches Tk events, so the name dialog is served while
+# the loop sleeps instead of by a root.update() at the top of every frame.
+loop_scheduler = LoopScheduler({
+    START: 1 / config.STATIC_FPS,
+    SMILE_SCREEN: 1 / config.TARGET_FPS,
+    FACE_RECOGNITION: 1 / config.TARGET_FPS,
+    FINAL_DISPLAY: 1 / config.STATIC_FPS,
+}, tk_root=root)
+root.bind_all('<KeyPress>', loop_scheduler.input_event, add='+')
+root.bind_all('<ButtonPress>', loop_scheduler.input_event, add='+')
+presenter = Presenter('Monitoring', on_present=loop_scheduler.frame_presented)
+
+def show_start_screen(pending_uploads):
+    if not pending_uploads:
+        return start_image
+    # Rows not yet synced to the registry, so staff can see when the venue network is down
+    image = start_image.copy()
+    cv.putText(image, f"{pending_uploads} registrations waiting to upload", (30, 1050),
+               cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return image
+
+read_failing = False
+
+def note_frame_read(ret):
+    # Logs when frames stop and start arriving rather than on every pass
+    global read_failing
+    if not ret and not read_failing:
+        logging.error("Failed to read frame from webcam - waiting for frames")
+    elif ret and read_failing:
+        logging.info("Frames from webcam resumed")
+    read_failing = not ret
 
 # Main loop
 logging.info("Starting main loop")
 while True:
     try:
-        root.update()
-        
         if current_state == START:
-            cv.imshow('Monitoring', start_image)
-            key = cv.waitKey(1)
-            logging.debug(f"Key pressed: {key}")
-            if key == ord(' '):
-                current_state = SMILE_SCREEN
-                smile_start_time = time.time()
-                logging.info("Spacebar pressed - Transition to SMILE_SCREEN")
+            pending_uploads = registry_sync.depth
+            presenter.show((START, pending_uploads), lambda: show_start_screen(pending_uploads))
         
         elif current_state == SMILE_SCREEN:
             ret, frame = cap.read()
-            if not ret:
-                logging.error("Failed to read frame from webcam")
-                cv.imshow('Monitoring', smile_image)
-                continue
-            
-            cv.imshow('Monitoring', smile_image)
-            frame = cv.flip(frame, 1)
-            frame = detect_face_and_smile(frame)
-            
-            if time.time() - smile_start_time > 3:
-                engine.say("Please smile!")
-                engine.runAndWait()
-                smile_start_time = time.time()
-                logging.debug("Voice prompt triggered")
-            
-            if smile_detected:
-                current_state = FACE_RECOGNITION
-                open_name_dialog()
-                logging.info("Smile detected - Transition to FACE_RECOGNITION")
+            note_frame_read(ret)
+            presenter.show((SMILE_SCREEN,), lambda: smile_image)
+            # Without a frame the screen stays up and the loop still ticks,
+            # so events are handled and 'q' quits while the camera is out
+            if ret:
+                frame = cv.flip(frame, 1)
+                frame = detect_face_and_smile(frame)
+                
+                if time.time() - smile_start_time > 3:
+                    speech.say(SMILE_PROMPT)
+                    smile_start_time = time.time()
+                    logging.debug("Voice prompt triggered")
+                
+                if smile_detected:
+                    speech.cancel()
+                    current_state = FACE_RECOGNITION
+                    open_name_dialog()
+                    logging.info("Smile detected - Transition to FACE_RECOGNITION")
         
         elif current_state == FACE_RECOGNITION:
-            bg_image = cv.imread('Background/new.png')
-            if bg_image is None:
-                logging.error("Failed to load new.png")
-                break
             ret, frame = cap.read()
+            note_frame_read(ret)
             
-            if not ret:
-                logging.error("Failed to read frame from webcam")
-                continue
-            
-            frame = cv.flip(frame, 1)
-            frame = detect_face_and_smile(frame)
-            
-            frame_resized = cv.resize(frame, (ROI_WIDTH, ROI_HEIGHT))
-            bg_image[ROI_Y:ROI_Y+ROI_HEIGHT, ROI_X:ROI_X+ROI_WIDTH] = frame_resized
+            # Without a frame the last one stays on screen
+            if ret:
+                frame = cv.flip(frame, 1)
+                frame = detect_face_and_smile(frame)
+                recognition_screen.paste(frame, ROI_X, ROI_Y, ROI_WIDTH, ROI_HEIGHT)
             
             if participant_name:
                 text = f"Player: {participant_name}"
                 (tw, th), _ = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 1.2, 2)
                 text_x = ROI_X + (ROI_WIDTH - tw) // 2
                 text_y = ROI_Y + ROI_HEIGHT + 50
-                cv.putText(bg_image, text, (text_x, text_y),
-                          cv.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+                recognition_screen.label('player', text, (text_x, text_y),
+                                         cv.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            else:
+                recognition_screen.label('player', '', None)
             
-            cv.imshow('Monitoring', bg_image)
+            presenter.present(recognition_screen.canvas)
             
             if participant_name and player_token:
                 current_state = FINAL_DISPLAY
@@ -357,13 +369,23 @@ while True:
             if final_display_start_time and time.time() - final_display_start_time > 5:
                 show_restart_button = True
             
-            display_frame = show_final_display()
-            cv.imshow('Monitoring', display_frame)
+            # Rebuilt only when the capture, name, token or restart button changes
+            presenter.show((FINAL_DISPLAY, capture_count, participant_name, player_token, show_restart_button),
+                           show_final_display)
 
-        key = cv.waitKey(1)
+        # Input is polled once per tick, while waiting out the frame budget
+        key = loop_scheduler.tick(current_state)
+        if startup_started is not None:
+            # The first frame is on screen once the tick has pumped the window
+            logging.info(f"Time to first frame: {time.perf_counter() - startup_started:.2f}s")
+            startup_started = None
         if key == ord('q'):
             logging.info("Quitting program")
             break
+        if current_state == START and key == ord(' '):
+            current_state = SMILE_SCREEN
+            smile_start_time = time.time()
+            logging.info("Spacebar pressed - Transition to SMILE_SCREEN")
 
     except Exception as e:
         logging.error(f"Error in main loop: {e}")
@@ -371,6 +393,17 @@ while True:
 
 # Cleanup
 cap.release()
+speech.close()
+registry_sync.close()
+logging.info(f"Registry sync stats: {registry_sync.stats()}")
+registration_db.close()
+registry.close()
+token_allocator.close()
+capture_store.close()
 cv.destroyAllWindows()
 root.destroy()
+logging.info(f"Present stats: {presenter.stats()}")
+logging.info(f"Loop scheduler stats: {loop_scheduler.stats()}")
+logging.info(f"Token allocator stats: {token_allocator.stats()}")
+logging.info(f"Capture store stats: {capture_store.stats()}")
 logging.info("Program terminated")
\ No newline at end of file
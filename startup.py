@@ -0,0 +1,62 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Startup orchestration for the kiosk scripts.
+#
+# Opening the camera, loading the cascades, decoding backgrounds and opening
+# the registration database do not depend on each other, so they run side by
+# side on a small thread pool. task() starts a step on a worker thread.
+# run() times a step that has to stay on the main thread (Tk, the OpenCV
+# window). result() waits for a step and can keep pumping the window while
+# it waits. report() logs when each step started and how long it took.
+
+
+class Startup:
+    def __init__(self, workers=4):
+        self.started = time.perf_counter()
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='Startup')
+        self._futures = {}
+        self._timings = {}   # name -> (start offset, duration)
+
+    def _timed(self, name, fn, *args):
+        began = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._timings[name] = (began - self.started, time.perf_counter() - began)
+
+    def task(self, name, fn, *args):
+        """Starts fn(*args) on a worker thread."""
+        self._futures[name] = self._executor.submit(self._timed, name, fn, *args)
+
+    def run(self, name, fn, *args):
+        """Runs fn(*args) on the calling thread, timed like a task."""
+        return self._timed(name, fn, *args)
+
+    def result(self, name, pump=None, poll=0.01):
+        """Waits for a task and returns its result, re-raising its exception.
+
+        pump, if given, is called every poll seconds while waiting (e.g. to
+        keep the OpenCV window responsive).
+        """
+        future = self._futures[name]
+        if pump is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=poll)
+            except TimeoutError:
+                pump()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def report(self):
+        lines = [f"Startup took {self.elapsed():.2f}s"]
+        for name, (offset, duration) in sorted(self._timings.items(), key=lambda item: item[1][0]):
+            lines.append(f"  {name:<14} +{offset * 1000:6.0f} ms  {duration * 1000:6.0f} ms")
+        logging.info("\n".join(lines))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
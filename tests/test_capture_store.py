@@ -0,0 +1,78 @@
+import os
+
+import cv2 as cv
+import numpy as np
+
+from capture_store import CaptureStore
+
+
+def photo():
+    return np.random.randint(0, 255, (64, 48, 3), np.uint8)
+
+
+def test_default_keeps_flat_lossless_path(tmp_path):
+    root = str(tmp_path / 'captures')
+    store = CaptureStore(root).start()
+    image = photo()
+    store.save('042', image)
+    store.close()
+    path = os.path.join(root, '042.png')
+    assert store.path('042') == path
+    assert np.array_equal(cv.imread(path), image)
+
+
+def test_sharded_layout(tmp_path):
+    root = str(tmp_path / 'captures')
+    store = CaptureStore(root, fmt='jpg', shard_digits=2).start()
+    store.save('1042', photo())
+    store.close()
+    assert store.path('1042') == os.path.join(root, '42', '1042.jpg')
+    assert os.path.exists(store.path('1042'))
+
+
+def test_index_and_flat_photos_survive_restart(tmp_path):
+    root = tmp_path / 'captures'
+    root.mkdir()
+    cv.imwrite(str(root / '007.png'), photo())   # saved by an older version
+    store = CaptureStore(str(root), shard_digits=2).start()
+    store.save('123', photo())
+    store.close()
+
+    store = CaptureStore(str(root), shard_digits=2)
+    assert sorted(store.tokens()) == ['007', '123']
+    assert store.path('007') == str(root / '007.png')
+    assert store.path('123') == os.path.join(str(root), '23', '123.png')
+
+
+def test_existing_index_skips_directory_scan(tmp_path):
+    root = tmp_path / 'captures'
+    store = CaptureStore(str(root)).start()
+    store.save('001', photo())
+    store.close()
+    # Not in the index, so only a directory scan would find it
+    cv.imwrite(str(root / '002.png'), photo())
+    assert CaptureStore(str(root)).tokens() == ['001']
+
+
+def test_malformed_index_lines_are_skipped(tmp_path):
+    root = tmp_path / 'captures'
+    root.mkdir()
+    (root / 'index.jsonl').write_text('{"path": "x.png"}\n[1, 2]\n{"tok\n'
+                                      '{"token": "005", "path": "005.png", "bytes": 1, "time": 0}\n')
+    assert CaptureStore(str(root)).tokens() == ['005']
+
+
+def test_close_waits_for_slow_save(tmp_path, monkeypatch):
+    import time
+    root = str(tmp_path / 'captures')
+    store = CaptureStore(root).start()
+    encode = cv.imencode
+
+    def slow_encode(*args):
+        time.sleep(0.3)
+        return encode(*args)
+    monkeypatch.setattr(cv, 'imencode', slow_encode)
+    store.save('009', photo())
+    store.close(timeout=0.05)
+    store._thread.join()
+    assert CaptureStore(root).tokens() == ['009']
@@ -0,0 +1,158 @@
+import json
+import time
+
+import pytest
+
+from registration_db import RegistrationDB, RegistrySync
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class Recorder:
+    """A send_batch that records the rows it accepts, or fails while failing is set."""
+
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.rows = []
+        self.calls = 0
+
+    def __call__(self, rows):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("registry unreachable")
+        self.rows.extend(rows)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'registrations.db')
+
+
+def write_journal(path, rows, sent_seq=None, torn_tail=False):
+    with open(path, 'w', encoding='utf-8') as f:
+        for seq, row in enumerate(rows, 1):
+            f.write(json.dumps({'seq': seq, 'time': 0.0, 'row': row}) + '\n')
+        if torn_tail:
+            f.write('{"seq": 99, "ro')
+    if sent_seq is not None:
+        with open(path + '.sent', 'w') as f:
+            f.write(str(sent_seq))
+
+
+def test_unsent_registrations_are_sent_after_restart(db_path):
+    db = RegistrationDB(db_path)
+    for i in range(3):
+        db.add(f"Player {i}", f"{i:03d}")
+    down = Recorder(failing=True)
+    sync = RegistrySync(db, down, target='sheets', interval=0.05, min_backoff=10.0).start()
+    assert wait_for(lambda: down.calls >= 1)
+    sync.close(timeout=0.5)
+    db.close()
+
+    db = RegistrationDB(db_path)
+    assert db.pending('sheets') == 3
+    up = Recorder()
+    sync = RegistrySync(db, up, target='sheets', interval=0.05).start()
+    assert wait_for(lambda: sync.depth == 0)
+    sync.close()
+    assert up.rows == [["Player 0", "000"], ["Player 1", "001"], ["Player 2", "002"]]
+    db.close()
+
+    # Nothing is sent twice once the cursor has moved past it
+    db = RegistrationDB(db_path)
+    again = Recorder()
+    sync = RegistrySync(db, again, target='sheets', interval=0.05).start()
+    time.sleep(0.2)
+    sync.close()
+    assert again.rows == []
+    db.close()
+
+
+def test_cursor_is_per_target(db_path):
+    db = RegistrationDB(db_path)
+    row_id = db.add("Ada", "001")
+    db.mark_synced('sheets', row_id)
+    assert db.pending('sheets') == 0
+    assert db.pending('file') == 1
+    assert db.unsynced('file', 10) == [(row_id, "Ada", "001")]
+    db.close()
+
+
+def test_import_journal_keeps_sent_rows_sent(tmp_path, db_path):
+    journal = str(tmp_path / 'registrations.jsonl')
+    rows = [["Ada", "001"], ["Grace", "002"], ["Alan", "003"], ["Edsger", "004"]]
+    write_journal(journal, rows, sent_seq=2, torn_tail=True)
+    db = RegistrationDB(db_path)
+    assert db.import_journal(journal, 'sheets') == 4
+    assert db.count() == 4
+    assert db.has_name("  grace ")
+    assert db.find_token("004")[0] == "Edsger"
+    assert [(name, token) for _, name, token in db.unsynced('sheets', 10)] == [("Alan", "003"), ("Edsger", "004")]
+
+    sent = Recorder()
+    sync = RegistrySync(db, sent, target='sheets', interval=0.05).start()
+    assert wait_for(lambda: sync.depth == 0)
+    sync.close()
+    assert sent.rows == [["Alan", "003"], ["Edsger", "004"]]
+    db.close()
+
+
+def test_import_journal_without_cursor_queues_everything(tmp_path, db_path):
+    journal = str(tmp_path / 'registrations.jsonl')
+    write_journal(journal, [["Ada", "001"], ["Grace", "002"]])
+    db = RegistrationDB(db_path)
+    assert db.import_journal(journal, 'sheets') == 2
+    assert db.pending('sheets') == 2
+    db.close()
+
+
+def test_import_journal_runs_once(tmp_path, db_path):
+    journal = str(tmp_path / 'registrations.jsonl')
+    write_journal(journal, [["Ada", "001"]], sent_seq=1)
+    db = RegistrationDB(db_path)
+    assert db.import_journal(journal, 'sheets') == 1
+    assert db.import_journal(journal, 'sheets') == 0
+    assert db.count() == 1
+    db.close()
+
+
+def test_import_journal_skips_reused_tokens(tmp_path, db_path):
+    journal = str(tmp_path / 'registrations.jsonl')
+    write_journal(journal, [["Ada", "001"], ["Grace", "001"], ["Alan", "002"]])
+    db = RegistrationDB(db_path)
+    assert db.import_journal(journal, 'sheets') == 2
+    assert db.find_token("001")[0] == "Ada"
+    db.close()
+
+
+def test_missing_journal_imports_nothing(tmp_path, db_path):
+    db = RegistrationDB(db_path)
+    assert db.import_journal(str(tmp_path / 'missing.jsonl'), 'sheets') == 0
+    db.close()
+
+
+def test_notify_during_backoff_does_not_extend_it(db_path):
+    db = RegistrationDB(db_path)
+    db.add("Ada", "001")
+    send = Recorder(failing=True)
+    sync = RegistrySync(db, send, interval=0.05, min_backoff=1.0, max_backoff=1.0).start()
+    assert wait_for(lambda: send.calls == 1)
+    failed_at = time.monotonic()
+    send.failing = False
+
+    # Woken halfway through the backoff, the retry still comes when it is due
+    time.sleep(0.5)
+    db.add("Grace", "002")
+    sync.notify()
+    assert wait_for(lambda: sync.depth == 0)
+    assert time.monotonic() - failed_at < 1.25   # backoff is 1.0 with +-20% jitter
+    assert send.calls == 2
+    sync.close()
+    db.close()
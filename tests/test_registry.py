@@ -0,0 +1,157 @@
+import json
+import time
+import threading
+
+import pytest
+
+pytest.importorskip('googleapiclient')
+
+from fake_sheets import FakeSheets, parse_range
+from registration_db import RegistrationDB, RegistrySync
+from registry import FakeSheetsRegistry, FileRegistry, create_registry
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def registry():
+    # Sheets client against an in-process fake_sheets.py server
+    registry = FakeSheetsRegistry(latency=0.0, error_rate=0.0, quota=0)
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = RegistrationDB(str(tmp_path / 'registrations.db'))
+    yield db
+    db.close()
+
+
+def test_parse_range():
+    assert parse_range('Sheet1!A:B') == ('Sheet1', 0, 1)
+    assert parse_range('Sheet1!B2:C') == ('Sheet1', 1, 2)
+    assert parse_range('A:A') == ('Sheet1', 0, 0)
+
+
+def test_append_and_names(registry):
+    assert registry.names() == []
+    registry.append([["Ada", "001"], ["Grace", "002"]])
+    registry.append([["Alan", "003"]])
+    assert registry.names() == ["Ada", "Grace", "Alan"]
+    assert registry.sheets.rows('Sheet1') == [["Ada", "001"], ["Grace", "002"], ["Alan", "003"]]
+
+
+def test_concurrent_appends_and_name_reads():
+    # The sync and name-index threads use the same registry at the same time
+    registry = FakeSheetsRegistry(latency=0.005)
+    errors = []
+
+    def run(call, count):
+        for i in range(count):
+            try:
+                call(i)
+            except Exception as e:
+                errors.append(e)
+
+    def append(i, desk):
+        registry.append([[f"P{desk}-{i}", "000"]])
+
+    calls = [lambda i, desk=desk: append(i, desk) for desk in range(2)]
+    calls += [lambda i: registry.names()] * 2
+    # Daemon threads, so a deadlock fails the test instead of hanging it
+    threads = [threading.Thread(target=run, args=(call, 15), daemon=True) for call in calls]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        assert not any(thread.is_alive() for thread in threads)
+        assert errors == []
+        assert len(registry.sheets.rows()) == 30
+    finally:
+        registry.close()
+
+
+def test_server_errors_raise(registry):
+    registry.sheets.error_rate = 1.0
+    with pytest.raises(Exception):
+        registry.append([["Ada", "001"]])
+    assert registry.sheets.rows('Sheet1') == []
+
+
+def test_quota_exceeded_raises():
+    registry = FakeSheetsRegistry(quota=1)
+    try:
+        registry.names()
+        with pytest.raises(Exception):
+            registry.names()
+        assert registry.sheets.throttled == 1
+    finally:
+        registry.close()
+
+
+def test_sync_retries_with_backoff_after_server_error(registry, db):
+    registry.sheets.error_rate = 1.0
+    for i in range(3):
+        db.add(f"Player {i}", f"{i:03d}")
+    sync = RegistrySync(db, registry.append, target=registry.name, interval=0.05,
+                        min_backoff=0.2, max_backoff=0.4).start()
+    assert wait_for(lambda: sync.failures >= 2)
+    assert sync.depth == 3
+    assert sync.last_error
+
+    # New registrations do not cut the backoff short
+    requests = registry.sheets.requests
+    db.add("Player 3", "003")
+    sync.notify()
+    time.sleep(0.1)
+    assert registry.sheets.requests - requests <= 1
+
+    registry.sheets.error_rate = 0.0
+    assert wait_for(lambda: sync.depth == 0)
+    sync.close()
+    assert registry.names() == ["Player 0", "Player 1", "Player 2", "Player 3"]
+    assert sync.stats()['sent'] == 4
+
+
+def test_imported_journal_is_synced_from_its_cursor(tmp_path, registry, db):
+    journal = str(tmp_path / 'registrations.jsonl')
+    with open(journal, 'w', encoding='utf-8') as f:
+        for seq, row in enumerate([["Ada", "001"], ["Grace", "002"], ["Alan", "003"]], 1):
+            f.write(json.dumps({'seq': seq, 'time': 0.0, 'row': row}) + '\n')
+    with open(journal + '.sent', 'w') as f:
+        f.write('1')
+    assert db.import_journal(journal, registry.name) == 3
+
+    sync = RegistrySync(db, registry.append, target=registry.name, interval=0.05).start()
+    assert wait_for(lambda: sync.depth == 0)
+    sync.close()
+    # Ada was already in the sheet before the migration
+    assert registry.names() == ["Grace", "Alan"]
+
+
+def test_file_registry(tmp_path):
+    registry = FileRegistry(str(tmp_path / 'registry.csv'))
+    assert registry.names() == []
+    registry.append([["Ada", "001"], ["Zoë, Jr.", "002"]])
+    assert registry.names() == ["Ada", "Zoë, Jr."]
+
+
+def test_fake_sheets_without_server():
+    sheets = FakeSheets()
+    sheets.append('fake', 'Sheet1!B:C', [["x", 1]])
+    assert sheets.rows() == [['', 'x', '1']]
+    assert sheets.get('Sheet1!B:B')['values'] == [['x']]
+
+
+def test_unknown_backend_is_an_error():
+    with pytest.raises(ValueError):
+        create_registry('fak')
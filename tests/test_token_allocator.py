@@ -0,0 +1,49 @@
+from token_allocator import TokenAllocator
+
+
+def test_tokens_are_unique_and_survive_restart(tmp_path):
+    log = str(tmp_path / 'tokens.log')
+    allocator = TokenAllocator(log, width=1)
+    first = {allocator.allocate() for _ in range(10)}
+    assert len(first) == 10
+    allocator.close()
+
+    allocator = TokenAllocator(log, width=1)
+    token = allocator.allocate()
+    assert len(token) == 2   # every 1-digit token was issued, so the width grew
+    assert allocator.stats()['issued'] == 11
+    allocator.close()
+
+
+def test_release_returns_token_to_pool(tmp_path):
+    allocator = TokenAllocator(str(tmp_path / 'tokens.log'), width=1)
+    tokens = [allocator.allocate() for _ in range(10)]
+    allocator.release(tokens[3])
+    assert allocator.allocate() == tokens[3]
+    allocator.close()
+
+
+def test_seeded_tokens_are_never_issued(tmp_path):
+    allocator = TokenAllocator(str(tmp_path / 'tokens.log'), width=1, issued=['0', '1', '2'])
+    tokens = {allocator.allocate() for _ in range(7)}
+    assert tokens.isdisjoint({'0', '1', '2'})
+    allocator.close()
+
+
+def test_torn_last_record_is_dropped(tmp_path):
+    log = tmp_path / 'tokens.log'
+    log.write_text("A 001\nA 002\nW")
+    allocator = TokenAllocator(str(log), width=3)
+    assert allocator.stats()['issued'] == 2
+    token = allocator.allocate()
+    allocator.close()
+    # The torn tail was cut off, so the new record is on a line of its own
+    assert log.read_text() == f"A 001\nA 002\nA {token}\n"
+
+
+def test_malformed_record_is_skipped(tmp_path):
+    log = tmp_path / 'tokens.log'
+    log.write_text("A 001\nX 5\nA\nA 003\n")
+    allocator = TokenAllocator(str(log), width=3)
+    assert allocator.stats()['issued'] == 2
+    allocator.close()
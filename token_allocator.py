@@ -0,0 +1,125 @@
+import os
+import random
+import threading
+import logging
+
+# Collision-free player tokens.
+#
+# No two registrants get the same token, so no photo overwrites another's.
+# The allocator keeps a shuffled pool of the tokens still free at the
+# current width. allocate() pops from it and release() swaps a token back in
+# at a random position; both are O(1). When the pool runs dry the width
+# grows by one digit and a fresh pool is dealt.
+#
+# Every allocate/release/width change is appended (fsynced) to a small log;
+# on startup the pool is rebuilt from it, so issued tokens survive restarts.
+
+
+class TokenAllocator:
+    def __init__(self, log_path, width=3, issued=()):
+        self.log_path = log_path
+        self.width = width
+        self._issued = set()
+        self._pool = []
+        self._lock = threading.Lock()
+        self._log = None
+        self.allocations = 0
+        self.releases = 0
+        self._load(issued)
+
+    def _replay(self):
+        """Applies the log to the issued set; returns True if it held any records."""
+        with open(self.log_path, 'rb') as f:
+            data = f.read()
+        complete, _, torn = data.rpartition(b'\n')
+        if torn:
+            # A crash mid-write leaves a partial last record. Its token was
+            # never handed out (allocate() returns after the fsync), so drop
+            # it, and cut it off so the next record starts on a fresh line.
+            logging.warning(f"Dropping torn last record {torn!r} from {self.log_path}")
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(len(data) - len(torn))
+        replayed = False
+        for line in complete.decode('utf-8', errors='replace').splitlines():
+            op, _, value = line.strip().partition(' ')
+            if not op:
+                continue
+            if not value.isdigit() or op not in ('W', 'A', 'R'):
+                logging.warning(f"Skipping malformed record {line!r} in {self.log_path}")
+                continue
+            if op == 'W':
+                self.width = max(self.width, int(value))
+            elif op == 'A':
+                self._issued.add(value)
+            else:
+                self._issued.discard(value)
+            replayed = True
+        return replayed
+
+    def _load(self, seed):
+        replayed = self._replay() if os.path.exists(self.log_path) else False
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+        if not replayed:
+            # First run: adopt tokens issued before the allocator existed
+            seeded = {token for token in seed if token.isdigit()}
+            for token in sorted(seeded):
+                self._append('A', token)
+            self._issued |= seeded
+            if seeded:
+                logging.info(f"Token allocator seeded with {len(seeded)} existing tokens")
+        self._deal()
+        logging.info(f"Token allocator: {len(self._pool)} of {10 ** self.width} "
+                     f"{self.width}-digit tokens free")
+
+    def _append(self, op, value):
+        self._log.write(f"{op} {value}\n")
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def _deal(self):
+        self._pool = [token for token in (str(n).zfill(self.width) for n in range(10 ** self.width))
+                      if token not in self._issued]
+        random.shuffle(self._pool)
+
+    def allocate(self):
+        with self._lock:
+            while not self._pool:
+                self.width += 1
+                self._append('W', self.width)
+                self._deal()
+                logging.warning(f"Token pool exhausted, widening tokens to {self.width} digits")
+            token = self._pool.pop()
+            self._issued.add(token)
+            self._append('A', token)
+            self.allocations += 1
+            return token
+
+    def release(self, token):
+        """Returns a token to the pool, e.g. when a registration is abandoned."""
+        with self._lock:
+            if token not in self._issued:
+                return
+            self._issued.discard(token)
+            self._append('R', token)
+            self.releases += 1
+            if len(token) == self.width:
+                self._pool.append(token)
+                i = random.randrange(len(self._pool))
+                self._pool[i], self._pool[-1] = self._pool[-1], self._pool[i]
+
+    def stats(self):
+        with self._lock:
+            capacity = 10 ** self.width
+            free = len(self._pool)
+            return {'width': self.width, 'issued': len(self._issued), 'free': free,
+                    'utilization': 1.0 - free / capacity,
+                    'allocations': self.allocations, 'releases': self.releases}
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
@@ -1,9 +1,14 @@
 import cv2 as cv
 import numpy as np
+from assets import assets
 import time # Added for timer
 
-import pyttsx3
-engine = pyttsx3.init() # Initialize text-to-speech engine
+import config
+from speech import SpeechWorker
+
+# Text-to-speech runs on its own thread so prompts never stall the camera loop
+SMILE_PROMPT = "Please smile!"
+speech = SpeechWorker(prompts=[SMILE_PROMPT], cache_dir=config.PROMPT_CACHE_DIR).start()
 
 
 # Load Haar cascade classifiers for face and smile detection
@@ -12,8 +17,8 @@ smile_cascade = cv.CascadeClassifier(cv.data.haarcascades + 'haarcascade_smile.x
 
 
 # Load images (Only Start and Smile images are needed initially)
-start_image = cv.imread('Background/Desktop Inital.png')  # Replace with your actual file path
-smile_image = cv.imread('Background/Desktop Squid Game.png')  # Replace with your actual file path
+start_image = assets.get('Background/Desktop Inital.png')  # Replace with your actual file path
+smile_image = assets.get('Background/Desktop Squid Game.png')  # Replace with your actual file path
 #recognition_image = cv.imread('White Screen.png')  # Replace with your actual file path (NOT USED directly)
 
 
@@ -95,20 +100,19 @@ while True:
         else: # Smile not detected
             elapsed_time = time.time() - smile_start_time
             if elapsed_time > 5:  # Speak prompt after 5 seconds
-                engine.say("Please smile!")
-                engine.runAndWait() # blocking call
+                speech.say(SMILE_PROMPT)
                 smile_start_time = time.time()  # Reset timer
 
     elif current_state == FACE_RECOGNITION:
         print("Current state: FACE_RECOGNITION")
         # --- Webcam Overlay Code Starts Here ---
 
-        # Load the background image (load it here, only when needed)
-        image_background = cv.imread('Background/Desktop Squid Game.png')
+        # Background image, decoded once and cached by assets.py
+        image_background = assets.get('Background/Desktop Squid Game.png', (1920, 1080))
         if image_background is None:
             print("Error: Could not load image. Please check the file path.")
             exit()
-        image_background = cv.resize(image_background, (1920, 1080))
+        image_background = image_background.copy()  # cached buffer is read-only
 
         success, frame = cap.read()  # Capture webcam frame HERE! VERY IMPORTANT!
         if not success:
@@ -154,4 +158,5 @@ while True:
 
 
 cap.release()  # Release webcam
+speech.close()
 cv.destroyAllWindows()
\ No newline at end of file